@@ -0,0 +1,180 @@
+import argparse
+import csv
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # Inherited by the workers, so stdout only carries the report
+from constants import WARRIOR, MAGE, ARCHER, TICK_RATE
+from controls import CallbackInput
+from stats import percentile
+from headless import HeadlessEngine
+
+RESULT_FIELDS = ["character", "seed", "ticks", "survival_time", "game_over", "score", "coins", "level", "health", "enemies"]
+TUNABLES = ["wave_interval", "wave_size_base", "wave_size_cap"]
+
+class BotPolicy:
+    def __init__(self, preferred_distance, danger_distance, pickup_distance):
+        # Backs away from anything inside danger_distance, closes in on targets past
+        # preferred_distance and detours for pickups when nothing is pressing
+        self.preferred_distance = preferred_distance
+        self.danger_distance = danger_distance
+        self.pickup_distance = pickup_distance
+
+    def __call__(self, game):
+        x, y = game.player.rect.center
+        enemy_index = game.swarm if game.swarm is not None else game.enemy_grid
+        nearby = enemy_index.k_nearest(x, y, 8, self.preferred_distance * 3)
+
+        push_x = push_y = 0.0
+        for enemy, distance in nearby:
+            if distance < self.danger_distance:
+                weight = (self.danger_distance - distance) / self.danger_distance + 0.1
+                push_x += (x - enemy.rect.centerx) / (distance or 1) * weight
+                push_y += (y - enemy.rect.centery) / (distance or 1) * weight
+        if push_x or push_y:
+            return steer(push_x, push_y)
+
+        pickup = game.pickups.grid.nearest(x, y, self.pickup_distance)
+        if pickup:
+            return steer(pickup[0].rect.centerx - x, pickup[0].rect.centery - y)
+
+        if nearby and nearby[0][1] > self.preferred_distance:
+            enemy = nearby[0][0]
+            return steer(enemy.rect.centerx - x, enemy.rect.centery - y)
+        return 0, 0
+
+def steer(dx, dy):
+    # Snap a direction to the eight keyboard directions
+    length = math.hypot(dx, dy)
+    if length == 0:
+        return 0, 0
+    dx, dy = dx / length, dy / length
+    return (dx > 0.38) - (dx < -0.38), (dy > 0.38) - (dy < -0.38)
+
+# Every character fires the same 100px projectile, so the policies differ in how close they let enemies get
+POLICIES = {
+    WARRIOR: BotPolicy(preferred_distance=70, danger_distance=45, pickup_distance=150),
+    MAGE: BotPolicy(preferred_distance=90, danger_distance=70, pickup_distance=200),
+    ARCHER: BotPolicy(preferred_distance=95, danger_distance=85, pickup_distance=250),
+}
+
+def run_one(task):
+    engine = HeadlessEngine(task["character"], CallbackInput(POLICIES[task["character"]]), enemy_backend=task["backend"],
+                            seed=task["seed"], upgrades=task["upgrades"])
+    game = engine.game
+    for name, value in task["tunables"].items():
+        setattr(game, name, value)
+    if task["upgrade_steps"]:
+        game.upgrade_steps.update(task["upgrade_steps"])
+        game.apply_upgrades()
+    summary = engine.run(task["ticks"])
+    game.close()
+    return {field: summary[field] for field in RESULT_FIELDS}
+
+def aggregate(results):
+    by_character = {}
+    for result in results:
+        by_character.setdefault(result["character"], []).append(result)
+    report = {}
+    for character, runs in sorted(by_character.items()):
+        survival = sorted(run["survival_time"] for run in runs)
+        report[character] = {
+            "runs": len(runs),
+            "death_rate": sum(run["game_over"] for run in runs) / len(runs),
+            "survival_mean": sum(survival) / len(runs),
+            "survival_p10": percentile(survival, 0.10),
+            "survival_p50": percentile(survival, 0.50),
+            "survival_p90": percentile(survival, 0.90),
+            "score_mean": sum(run["score"] for run in runs) / len(runs),
+            "coins_mean": sum(run["coins"] for run in runs) / len(runs),
+            "level_mean": sum(run["level"] for run in runs) / len(runs),
+        }
+    return report
+
+def parse_assignment(text):
+    # Whole numbers stay ints so stats like damage, and the enemy health they feed, stay integral
+    name, value = text.rsplit("=", 1)
+    try:
+        return name, int(value)
+    except ValueError:
+        return name, float(value)
+
+def main():
+    parser = argparse.ArgumentParser(description="Fan seeded headless bot runs out over worker processes and aggregate the outcomes")
+    parser.add_argument("--characters", nargs="*", choices=list(POLICIES), default=list(POLICIES))
+    parser.add_argument("--runs", type=int, default=100, help="Runs per character")
+    parser.add_argument("--seed", type=int, default=0, help="First seed, run i uses seed + i")
+    parser.add_argument("--minutes", type=float, default=5, help="Cap on simulated time per run")
+    parser.add_argument("--backend", choices=["sprites", "swarm"], default="sprites")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--wave-interval", type=float)
+    parser.add_argument("--wave-size-base", type=int)
+    parser.add_argument("--wave-size-cap", type=int)
+    parser.add_argument("--upgrade", nargs="*", type=parse_assignment, default=[], metavar="NAME=LEVEL",
+                        help="Shop upgrade levels the runs start with")
+    parser.add_argument("--upgrade-step", nargs="*", type=parse_assignment, default=[], metavar="NAME=STEP",
+                        help="Override the stat gained per upgrade level")
+    parser.add_argument("--csv", help="Write one row per run to this file")
+    parser.add_argument("--output", help="Write the aggregate JSON to this file instead of stdout")
+    args = parser.parse_args()
+
+    tunables = {name: getattr(args, name) for name in TUNABLES if getattr(args, name) is not None}
+    upgrades = {name: int(level) for name, level in args.upgrade}
+    tasks = [
+        {
+            "character": character,
+            "seed": args.seed + i,
+            "ticks": int(args.minutes * 60 * TICK_RATE),
+            "backend": args.backend,
+            "tunables": tunables,
+            "upgrades": upgrades,
+            "upgrade_steps": dict(args.upgrade_step),
+        }
+        for character in args.characters
+        for i in range(args.runs)
+    ]
+
+    start = time.perf_counter()
+    # Runs are independent and similar in cost, small chunks keep every worker busy until the end
+    chunksize = max(1, len(tasks) // (args.workers * 8))
+    # Spawned workers start from a clean interpreter instead of a fork of this one
+    pool = multiprocessing.get_context("spawn").Pool(args.workers)
+    try:
+        results = list(pool.imap_unordered(run_one, tasks, chunksize=chunksize))
+    finally:
+        # Let the workers exit on their own, SDL traps the SIGTERM that terminate() sends
+        pool.close()
+        pool.join()
+    elapsed = time.perf_counter() - start
+    results.sort(key=lambda result: (result["character"], result["seed"]))
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+
+    report = {
+        "meta": {
+            "runs": len(results),
+            "workers": args.workers,
+            "wall_time": elapsed,
+            "tunables": tunables,
+            "upgrades": upgrades,
+            "upgrade_steps": dict(args.upgrade_step),
+        },
+        "characters": aggregate(results),
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+    print(f"{len(results)} runs in {elapsed:.1f}s on {args.workers} workers", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import time
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # pygame's import banner would corrupt the JSON on stdout
+import pygame
+from headless import HeadlessEngine
+from controls import ScriptedInput
+from constants import WIDTH, WARRIOR
+from stats import percentile
+from resources import asset_cache
+
+PHASES = ["update", "spawn_enemy_wave", "resolve_collisions", "update_chunks", "draw"]
+ENEMY_COUNTS = [100, 1000, 10000]
+SCENARIO_SCRIPT = [(1, 0, 60), (0, 1, 60), (-1, 0, 60), (0, -1, 60)]
+
+def instrument(game, name, samples):
+    # Shadow the bound method on the instance so internal self.<phase>() calls are timed too
+    original = getattr(game, name)
+
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        result = original(*args, **kwargs)
+        samples[name].append(time.perf_counter() - start)
+        return result
+
+    setattr(game, name, timed)
+
+def summarize(values):
+    if not values:
+        return {"calls": 0, "total_ms": 0.0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(values)
+    return {
+        "calls": len(values),
+        "total_ms": sum(values) * 1000,
+        "mean_ms": sum(values) / len(values) * 1000,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "max_ms": max(values) * 1000,
+    }
+
+def populate(game, enemy_count):
+    # Spread the horde over the live chunks around the player, some on screen and some off
+    rng = game.rng
+    positions = []
+    for _ in range(enemy_count):
+        angle = rng.uniform(0, 2 * math.pi)
+        distance = rng.uniform(WIDTH * 0.3, WIDTH * 1.5)
+        positions.append((math.cos(angle) * distance, math.sin(angle) * distance))
+    speeds = [rng.uniform(1, 3) for _ in positions]
+    if game.swarm is not None:
+        game.swarm.spawn(positions, speeds)
+        return
+    from entities import Enemy
+    for position, speed in zip(positions, speeds):
+        game.add_enemy(Enemy.spawn(position, speed))
+
+def run_scenario(enemy_count, backend, ticks, seed):
+    engine = HeadlessEngine(WARRIOR, ScriptedInput(SCENARIO_SCRIPT, loop=True), enemy_backend=backend, seed=seed)
+    game = engine.game
+    populate(game, enemy_count)
+    # Keep the run alive and spawning so every phase gets exercised
+    game.player.max_health = game.player.health = 10 ** 9
+    game.wave_interval = 1
+
+    samples = {name: [] for name in PHASES}
+    for name in PHASES:
+        instrument(game, name, samples)
+
+    # Sprites are preloaded, so any miss from here on is a stall on the hot path
+    cache_before = asset_cache.stats()
+    start = time.perf_counter()
+    allocations = []
+    asset_cache.end_frame()
+    for _ in range(ticks):
+        engine.step()
+        game.draw()
+        allocations.append(asset_cache.end_frame())
+    elapsed = time.perf_counter() - start
+    cache_after = asset_cache.stats()
+    hits = cache_after["hits"] - cache_before["hits"]
+    misses = cache_after["misses"] - cache_before["misses"]
+
+    return {
+        "backend": backend,
+        "enemies_start": enemy_count,
+        "enemies_end": len(game.swarm) if game.swarm is not None else game.entities.count("enemies"),
+        "ticks": ticks,
+        "ticks_per_second": ticks / elapsed if elapsed else 0.0,
+        "phases": {name: summarize(values) for name, values in samples.items()},
+        "asset_cache": {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "cached": cache_after["cached"],
+        },
+        # Gameplay surfaces created per tick, only HUD text changes should ever show up here
+        "surface_allocations": {
+            "total": sum(allocations),
+            "mean_per_frame": sum(allocations) / len(allocations) if allocations else 0.0,
+            "max_per_frame": max(allocations, default=0),
+        },
+    }
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    regressions = []
+    for key, scenario in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(key)
+        if previous is None:
+            continue
+        if scenario["ticks_per_second"] < previous["ticks_per_second"] * (1 - tolerance):
+            regressions.append(f"{key}: ticks/s {previous['ticks_per_second']:.1f} -> {scenario['ticks_per_second']:.1f}")
+        misses, previous_misses = scenario["asset_cache"]["misses"], previous.get("asset_cache", {}).get("misses", 0)
+        if misses > previous_misses:
+            regressions.append(f"{key}: asset cache misses after preload {previous_misses} -> {misses}")
+        # Seeded runs render the same HUD text, so any extra surface is new churn
+        allocated, previous_allocated = scenario["surface_allocations"]["total"], previous.get("surface_allocations", {}).get("total")
+        if previous_allocated is not None and allocated > previous_allocated:
+            regressions.append(f"{key}: surface allocations {previous_allocated} -> {allocated}")
+        for name, phase in scenario["phases"].items():
+            before = previous["phases"].get(name)
+            if not before or phase["mean_ms"] - before["mean_ms"] < min_delta_ms:
+                continue
+            if phase["mean_ms"] > before["mean_ms"] * (1 + tolerance):
+                regressions.append(f"{key}: {name} mean {before['mean_ms']:.3f}ms -> {phase['mean_ms']:.3f}ms")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the simulation hot paths headlessly")
+    parser.add_argument("--ticks", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--enemies", type=int, nargs="*", default=ENEMY_COUNTS)
+    parser.add_argument("--backend", choices=["sprites", "swarm", "all"], default="all")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+    parser.add_argument("--baseline", help="Compare against a stored results file and exit non-zero on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed slowdown before a result counts as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="Ignore phase slowdowns smaller than this, they are timer noise")
+    args = parser.parse_args()
+
+    backends = ["sprites", "swarm"] if args.backend == "all" else [args.backend]
+    if "swarm" in backends:
+        from swarm import np
+        if np is None:
+            if args.backend == "swarm":
+                parser.error("the swarm backend requires numpy")
+            backends.remove("swarm")
+
+    results = {
+        "meta": {
+            "python": sys.version.split()[0],
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "ticks": args.ticks,
+        },
+        "scenarios": {},
+    }
+    for backend in backends:
+        for enemy_count in args.enemies:
+            results["scenarios"][f"{backend}-{enemy_count}"] = run_scenario(enemy_count, backend, args.ticks, args.seed)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
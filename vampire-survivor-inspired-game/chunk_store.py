@@ -0,0 +1,147 @@
+import mmap
+import queue
+import struct
+import tempfile
+import threading
+
+# A record is the entity kind, its center relative to the chunk origin, health and speed
+HEADER = struct.Struct("<iiI")
+RECORD = struct.Struct("<BHHhe")
+KIND_ENEMY = 0
+KIND_ITEM = 1
+KIND_COIN = 2
+COMPACT_THRESHOLD = 1 << 20  # Rewrite the region file once this many bytes are stale
+
+def pack_chunk(key, records):
+    return HEADER.pack(key[0], key[1], len(records)) + b"".join(RECORD.pack(*record) for record in records)
+
+def unpack_chunk(payload):
+    chunk_x, chunk_y, count = HEADER.unpack_from(payload)
+    records = [RECORD.unpack_from(payload, HEADER.size + i * RECORD.size) for i in range(count)]
+    return (chunk_x, chunk_y), records
+
+class ChunkStore:
+    def __init__(self, path=None, threaded=True):
+        # Region file of packed chunk records, appended to and read back through mmap
+        self.file = open(path, 'w+b') if path else tempfile.TemporaryFile()
+        self.index = {}
+        self.size = 0
+        self.garbage = 0
+        self.map = None
+        # Main-thread view of which chunks are on disk
+        self.stored = set()
+        self.generation = 0
+        self.results = queue.SimpleQueue()
+        self.threaded = threaded
+        self.requests = None
+        self.worker = None
+        if threaded:
+            self.requests = queue.SimpleQueue()
+            self.worker = threading.Thread(target=self.work, name="chunk-store", daemon=True)
+            self.worker.start()
+
+    def save(self, key, records):
+        self.stored.add(key)
+        self.submit(self.write, key, pack_chunk(key, records))
+
+    def merge(self, key, records):
+        # Adds to whatever is on disk for the chunk instead of replacing it. Queued behind
+        # any save still pending for the key, so a newer save can't be overwritten
+        self.stored.add(key)
+        self.submit(self.write_merged, key, records)
+
+    def load(self, key):
+        # Never blocks, the records show up in poll() once the worker has read them
+        if key not in self.stored:
+            return False
+        self.stored.discard(key)
+        self.submit(self.read, key, self.generation)
+        return True
+
+    def poll(self):
+        loaded = []
+        while True:
+            try:
+                generation, key, records = self.results.get_nowait()
+            except queue.Empty:
+                return loaded
+            if generation == self.generation:
+                loaded.append((key, records))
+
+    def clear(self):
+        self.stored.clear()
+        self.generation += 1
+        self.submit(self.truncate)
+
+    def close(self):
+        if self.worker is not None:
+            self.requests.put((None, ()))
+            self.worker.join()
+            self.worker = None
+        self.unmap()
+        self.file.close()
+
+    def submit(self, operation, *args):
+        if self.requests is None:
+            operation(*args)
+        else:
+            self.requests.put((operation, args))
+
+    def work(self):
+        while True:
+            operation, args = self.requests.get()
+            if operation is None:
+                return
+            operation(*args)
+
+    def write(self, key, payload):
+        previous = self.index.get(key)
+        if previous is not None:
+            self.garbage += previous[1]
+        self.file.seek(self.size)
+        self.file.write(payload)
+        self.file.flush()
+        self.index[key] = (self.size, len(payload))
+        self.size += len(payload)
+        if self.garbage > COMPACT_THRESHOLD and self.garbage * 2 > self.size:
+            self.compact()
+
+    def write_merged(self, key, records):
+        previous = self.index.get(key)
+        if previous is not None:
+            offset, length = previous
+            self.file.seek(offset)
+            _, stored = unpack_chunk(self.file.read(length))
+            records = stored + list(records)
+        self.write(key, pack_chunk(key, records))
+
+    def read(self, key, generation):
+        offset, length = self.index.pop(key)
+        self.garbage += length
+        if self.map is None or len(self.map) < offset + length:
+            self.unmap()
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        _, records = unpack_chunk(self.map[offset:offset + length])
+        self.results.put((generation, key, records))
+
+    def compact(self):
+        payloads = {}
+        for key, (offset, length) in self.index.items():
+            self.file.seek(offset)
+            payloads[key] = self.file.read(length)
+        self.truncate()
+        for key, payload in payloads.items():
+            self.write(key, payload)
+
+    def truncate(self):
+        self.unmap()
+        self.file.seek(0)
+        self.file.truncate()
+        self.index.clear()
+        self.size = 0
+        self.garbage = 0
+
+    def unmap(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
@@ -0,0 +1,92 @@
+import pygame
+
+CHUNK_SIZE = 800
+RENDER_DISTANCE = 2
+RECENTER_MARGIN = 32  # How far past a chunk border the player goes before the live area follows
+
+class Chunk:
+    def __init__(self, x, y):
+        self.key = (x, y)
+        self.rect = pygame.Rect(x * CHUNK_SIZE, y * CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE)
+        self.enemies = pygame.sprite.Group()
+        self.items = pygame.sprite.Group()
+        self.coins = pygame.sprite.Group()
+
+class ChunkMap:
+    def __init__(self):
+        # Only chunks within RENDER_DISTANCE of the player are kept
+        self.chunks = {}
+        self.center = None
+
+    def key_of(self, x, y):
+        return int(x // CHUNK_SIZE), int(y // CHUNK_SIZE)
+
+    def is_live(self, key):
+        return (abs(key[0] - self.center[0]) <= RENDER_DISTANCE and
+                abs(key[1] - self.center[1]) <= RENDER_DISTANCE)
+
+    def bounds(self):
+        # World-space (left, top, right, bottom) covered by the live chunks
+        return (
+            (self.center[0] - RENDER_DISTANCE) * CHUNK_SIZE,
+            (self.center[1] - RENDER_DISTANCE) * CHUNK_SIZE,
+            (self.center[0] + RENDER_DISTANCE + 1) * CHUNK_SIZE,
+            (self.center[1] + RENDER_DISTANCE + 1) * CHUNK_SIZE,
+        )
+
+    def get(self, key):
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.chunks[key] = Chunk(*key)
+        return chunk
+
+    def add(self, sprite, kind):
+        key = self.key_of(*sprite.rect.center)
+        if self.center is not None and not self.is_live(key):
+            return False
+        getattr(self.get(key), kind).add(sprite)
+        sprite.chunk_key = key
+        return True
+
+    def relocate(self, sprite, kind):
+        # Moves a sprite to the chunk under its center; False means it left the live area
+        key = self.key_of(*sprite.rect.center)
+        if key == sprite.chunk_key:
+            return True
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            return False
+        old_chunk = self.chunks.get(sprite.chunk_key)
+        if old_chunk is not None:
+            getattr(old_chunk, kind).remove(sprite)
+        getattr(chunk, kind).add(sprite)
+        sprite.chunk_key = key
+        return True
+
+    def recenter(self, x, y):
+        # Returns the keys that came into range and the chunks that fell out of it,
+        # only does work when the player changes chunk
+        center = self.key_of(x, y)
+        if center == self.center:
+            return [], []
+        if self.center is not None:
+            # Stepping back by the margin must still land in the new chunk, so a player
+            # walking along a border doesn't evict and reload a row of chunks every tick
+            back_x = x + RECENTER_MARGIN * ((center[0] < self.center[0]) - (center[0] > self.center[0]))
+            back_y = y + RECENTER_MARGIN * ((center[1] < self.center[1]) - (center[1] > self.center[1]))
+            if self.key_of(back_x, back_y) != center:
+                return [], []
+        self.center = center
+        created = []
+        for dx in range(-RENDER_DISTANCE, RENDER_DISTANCE + 1):
+            for dy in range(-RENDER_DISTANCE, RENDER_DISTANCE + 1):
+                key = (center[0] + dx, center[1] + dy)
+                if key not in self.chunks:
+                    self.get(key)
+                    created.append(key)
+        evicted = [key for key in self.chunks if not self.is_live(key)]
+        return created, [self.chunks.pop(key) for key in evicted]
+
+    def clear(self):
+        self.chunks.clear()
+        self.center = None
@@ -20,4 +20,14 @@ ARCHER = "Archer"
 
 # File paths
 SAVE_FILE = "game_data.json"
+REPLAY_DIR = "replays"
 
+# Simulation rate, the world advances this many fixed steps per second
+TICK_RATE = 60
+MAX_FPS = 144  # Render cap, frames past the tick rate are interpolated
+
+
+# Object pool high-water marks
+ENEMY_POOL_SIZE = 512
+PROJECTILE_POOL_SIZE = 256
+MELEE_POOL_SIZE = 64
@@ -0,0 +1,36 @@
+import pygame
+
+class KeyboardInput:
+    def read(self, game):
+        keys = pygame.key.get_pressed()
+        dx = keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]
+        dy = keys[pygame.K_DOWN] - keys[pygame.K_UP]
+        return dx, dy
+
+class ScriptedInput:
+    def __init__(self, segments, loop=False):
+        # Each segment is (dx, dy, ticks); the script holds still once it runs out
+        self.segments = [(int(dx), int(dy), int(ticks)) for dx, dy, ticks in segments if int(ticks) > 0]
+        self.loop = loop
+        self.index = 0
+        self.remaining = self.segments[0][2] if self.segments else 0
+
+    def read(self, game):
+        while self.index < len(self.segments) and self.remaining <= 0:
+            self.index += 1
+            if self.index == len(self.segments) and self.loop:
+                self.index = 0
+            if self.index < len(self.segments):
+                self.remaining = self.segments[self.index][2]
+        if self.index >= len(self.segments):
+            return 0, 0
+        self.remaining -= 1
+        dx, dy, _ = self.segments[self.index]
+        return dx, dy
+
+class CallbackInput:
+    def __init__(self, callback):
+        self.callback = callback
+
+    def read(self, game):
+        return self.callback(game)
@@ -1,17 +1,66 @@
 import pygame
-import random
 import math
 from constants import WIDTH, HEIGHT, WHITE, BLACK, RED, GREEN, BLUE, WARRIOR, MAGE, ARCHER, GOLD
+from constants import ENEMY_POOL_SIZE, PROJECTILE_POOL_SIZE, MELEE_POOL_SIZE
+from resources import asset_cache
+from pool import Pool
+
+MELEE_LIFETIME = 5  # Ticks a melee swing stays out
+
+class FacingSprite(pygame.sprite.Sprite):
+    def set_facing(self, dx):
+        # Swap to the pre-flipped variant only when the direction actually changes
+        if dx < 0 and not self.facing_left:
+            self.facing_left = True
+            self.image = self.flipped_image
+        elif dx > 0 and self.facing_left:
+            self.facing_left = False
+            self.image = self.original_image
+
+class MovingSprite(pygame.sprite.Sprite):
+    # The float center is authoritative, rect is rounded from it for drawing and collisions
+    x = 0.0
+    y = 0.0
+
+    def place(self, x, y):
+        self.x = float(x)
+        self.y = float(y)
+        self.rect.center = (round(self.x), round(self.y))
+
+    def move_by(self, dx, dy):
+        self.place(self.x + dx, self.y + dy)
+
+class PooledSprite(pygame.sprite.Sprite):
+    pool = None
+    pooled = False
+    generation = 0  # Bumped on every kill so timers armed for an earlier life are ignored
+
+    @classmethod
+    def spawn(cls, *args):
+        return cls.pool.acquire(*args)
+
+    def kill(self):
+        # Killed instances go back to their pool to be reset and reused
+        super().kill()
+        self.generation += 1
+        if self.pool is not None:
+            self.pool.release(self)
+
+class Player(MovingSprite, FacingSprite):
+    sprite_paths = {
+        WARRIOR: "assets/warrior_sprite.png",
+        MAGE: "assets/mage_sprite.png",
+        ARCHER: "assets/archer_sprite.png",
+    }
+    sprite_size = (64, 64)  # Increased size for better visibility
 
-class Player(pygame.sprite.Sprite):
     def __init__(self, character_type):
         super().__init__()
         self.character_type = character_type
-        self.original_image = None
         self.load_sprite()
         self.rect = self.image.get_rect()
         self.radius = int(min(self.rect.width, self.rect.height) * 0.25)  # Circular hitbox, 25% of sprite size
-        self.rect.center = (0, 0)  # Start at the center of the world
+        self.place(0, 0)  # Start at the center of the world
         self.speed = 5
         self.health = 100
         self.max_health = 100
@@ -19,31 +68,31 @@ class Player(pygame.sprite.Sprite):
         self.experience = 0
         self.level = 1
         self.attack_range = 100
-        self.attack_cooldown = 0
+        self.attack_ready = True  # Re-armed by a timer attack_interval ticks after each shot
         self.attack_speed = 1.0
         self.cooldown_reduction = 0.0
         self.attack_interval = self.get_attack_cooldown()
         self.set_attack_interval()
 
     def load_sprite(self):
-        sprite_size = (64, 64)  # Increased size for better visibility
-        try:
-            if self.character_type == WARRIOR:
-                self.original_image = pygame.image.load("assets/warrior_sprite.png").convert_alpha()
-            elif self.character_type == MAGE:
-                self.original_image = pygame.image.load("assets/mage_sprite.png").convert_alpha()
-            elif self.character_type == ARCHER:
-                self.original_image = pygame.image.load("assets/archer_sprite.png").convert_alpha()
-            else:
-                raise ValueError(f"Invalid character type: {self.character_type}")
-        
-            self.original_image = pygame.transform.scale(self.original_image, sprite_size)
-        except (pygame.error, FileNotFoundError):
-            print(f"Error loading {self.character_type.lower()}_sprite.png. Using fallback sprite.")
-            self.original_image = pygame.Surface(sprite_size, pygame.SRCALPHA)
-            pygame.draw.circle(self.original_image, BLUE, (sprite_size[0]//2, sprite_size[1]//2), sprite_size[0]//2)
+        self.original_image = Player.get_sprite(self.character_type)
+        self.flipped_image = Player.get_sprite(self.character_type, flip=True)
+        self.facing_left = False
         self.image = self.original_image
 
+    @staticmethod
+    def get_sprite(character_type, flip=False):
+        if character_type not in Player.sprite_paths:
+            raise ValueError(f"Invalid character type: {character_type}")
+
+        def create_fallback_sprite(sprite_size):
+            print(f"Error loading {character_type.lower()}_sprite.png. Using fallback sprite.")
+            image = pygame.Surface(sprite_size, pygame.SRCALPHA)
+            pygame.draw.circle(image, BLUE, (sprite_size[0]//2, sprite_size[1]//2), sprite_size[0]//2)
+            return image
+
+        return asset_cache.get(Player.sprite_paths[character_type], Player.sprite_size, flip, create_fallback_sprite)
+
     def get_attack_cooldown(self):
         if self.character_type == WARRIOR:
             return 30  # 0.5 seconds at 60 FPS
@@ -59,162 +108,209 @@ class Player(pygame.sprite.Sprite):
         self.attack_interval = int(base_interval / self.attack_speed * (1 - self.cooldown_reduction))
 
     def move(self, dx, dy):
-        if self.original_image is not None:
-            if dx < 0:  # Moving left
-                self.image = pygame.transform.flip(self.original_image, True, False)
-            elif dx > 0:  # Moving right
-                self.image = pygame.transform.flip(self.original_image, False, False)
-        
-        self.rect.x += dx * self.speed
-        self.rect.y += dy * self.speed
-
-    def update(self, enemies):
-        self.attack_cooldown = max(0, self.attack_cooldown - 1)
-        if self.attack_cooldown == 0 and enemies:
-            nearest_enemy = min(enemies, key=lambda e: math.hypot(e.rect.centerx - self.rect.centerx, e.rect.centery - self.rect.centery))
-            if math.hypot(nearest_enemy.rect.centerx - self.rect.centerx, nearest_enemy.rect.centery - self.rect.centery) <= self.attack_range:
-                self.attack_cooldown = self.attack_interval
-                return self.attack(nearest_enemy)
+        self.set_facing(dx)
+        self.move_by(dx * self.speed, dy * self.speed)
+
+    def update(self, enemy_index):
+        if self.attack_ready:
+            target = enemy_index.nearest(self.rect.centerx, self.rect.centery, self.attack_range)
+            if target:
+                self.attack_ready = False
+                return self.attack(target[0])
         return None
 
+    def reload(self):
+        self.attack_ready = True
+
     def attack(self, target):
         dx = target.rect.centerx - self.rect.centerx
         dy = target.rect.centery - self.rect.centery
         angle = math.atan2(dy, dx)
         speed = 5
-        return Projectile(self.rect.centerx, self.rect.centery, math.cos(angle) * speed, math.sin(angle) * speed, self.damage, self.attack_range)
+        return Projectile.spawn(self.x, self.y, math.cos(angle) * speed, math.sin(angle) * speed, self.damage, self.attack_range)
 
-class Enemy(pygame.sprite.Sprite):
-    def __init__(self, spawn_position):
+class Enemy(PooledSprite, MovingSprite, FacingSprite):
+    kind = "enemies"  # Registry storage the entity lives in
+    sprite_path = "assets/enemy_sprite.png"
+    sprite_size = (48, 48)  # Slightly smaller than the player
+
+    def __init__(self, spawn_position, speed):
         super().__init__()
         self.load_sprite()
         self.rect = self.image.get_rect()
         self.radius = int(min(self.rect.width, self.rect.height) * 0.25)  # Circular hitbox, 25% of sprite size
-        self.rect.center = spawn_position
-        self.speed = random.uniform(1, 3)
+        self.reset(spawn_position, speed)
+
+    def reset(self, spawn_position, speed):
+        self.place(*spawn_position)
+        self.speed = speed  # Rolled by the caller so runs can be replayed from a seed
         self.health = 30
+        self.facing_left = False
+        self.image = self.original_image
 
     def load_sprite(self):
-        sprite_size = (48, 48)  # Slightly smaller than the player
-        try:
-            self.original_image = pygame.image.load("assets/enemy_sprite.png").convert_alpha()
-            self.original_image = pygame.transform.scale(self.original_image, sprite_size)
-        except pygame.error:
-            print("Error loading enemy_sprite.png. Using fallback sprite.")
-            self.original_image = pygame.Surface(sprite_size, pygame.SRCALPHA)
-            pygame.draw.circle(self.original_image, RED, (sprite_size[0]//2, sprite_size[1]//2), sprite_size[0]//2)
+        self.original_image = Enemy.get_sprite()
+        self.flipped_image = Enemy.get_sprite(flip=True)
+        self.facing_left = False
         self.image = self.original_image
 
-    def update(self, player):
-        dx = player.rect.centerx - self.rect.centerx
-        dy = player.rect.centery - self.rect.centery
-        dist = math.hypot(dx, dy)
-    
-        if dx < 0:  # Moving left
-            self.image = pygame.transform.flip(self.original_image, True, False)
-        elif dx > 0:  # Moving right
-            self.image = pygame.transform.flip(self.original_image, False, False)
-
-        if dist != 0:
-            dx, dy = dx / dist, dy / dist
-            self.rect.x += dx * self.speed
-            self.rect.y += dy * self.speed
+    @staticmethod
+    def get_sprite(flip=False):
+        return asset_cache.get(Enemy.sprite_path, Enemy.sprite_size, flip, Enemy.create_fallback_sprite)
+
+    @staticmethod
+    def create_fallback_sprite(sprite_size):
+        print("Error loading enemy_sprite.png. Using fallback sprite.")
+        image = pygame.Surface(sprite_size, pygame.SRCALPHA)
+        pygame.draw.circle(image, RED, (sprite_size[0]//2, sprite_size[1]//2), sprite_size[0]//2)
+        return image
+
+    def update(self, flow_field, cell):
+        # Heading and separation are shared by every enemy in the same flow field cell
+        if cell.exact:
+            dx, dy = flow_field.aim(self.x, self.y)
+        else:
+            dx, dy = cell.heading_x, cell.heading_y
+        self.set_facing(dx)
+        self.move_by(dx * self.speed + cell.push_x + (self.x - cell.center_x) * cell.spring,
+                     dy * self.speed + cell.push_y + (self.y - cell.center_y) * cell.spring)
 
     def take_damage(self, damage):
         self.health -= damage
         return self.health <= 0
 
+def random_pickup_position(player_pos, rng):
+    angle = rng.uniform(0, 2 * math.pi)
+    distance = rng.uniform(WIDTH // 2, WIDTH)
+    return player_pos[0] + math.cos(angle) * distance, player_pos[1] + math.sin(angle) * distance
+
 class Item(pygame.sprite.Sprite):
-    def __init__(self, player_pos):
+    kind = "items"
+    sprite_path = "assets/item_sprite.png"
+    sprite_size = (32, 32)
+
+    def __init__(self, position):
         super().__init__()
         self.load_sprite()
         self.rect = self.image.get_rect()
-        angle = random.uniform(0, 2 * math.pi)
-        distance = random.uniform(WIDTH // 2, WIDTH)
-        self.rect.centerx = player_pos[0] + math.cos(angle) * distance
-        self.rect.centery = player_pos[1] + math.sin(angle) * distance
+        self.rect.centerx = position[0]
+        self.rect.centery = position[1]
 
     def load_sprite(self):
-        sprite_size = (32, 32)
-        try:
-            self.image = pygame.image.load("assets/item_sprite.png").convert_alpha()
-            self.image = pygame.transform.scale(self.image, sprite_size)
-        except pygame.error:
-            print("Error loading item_sprite.png. Using fallback sprite.")
-            self.image = pygame.Surface(sprite_size)
-            self.image.fill(GREEN)  # Use green color for item
+        self.image = asset_cache.get(Item.sprite_path, Item.sprite_size, fallback=Item.create_fallback_sprite)
+
+    @staticmethod
+    def create_fallback_sprite(sprite_size):
+        print("Error loading item_sprite.png. Using fallback sprite.")
+        image = pygame.Surface(sprite_size)
+        image.fill(GREEN)  # Use green color for item
+        return image
 
 class Coin(pygame.sprite.Sprite):
-    def __init__(self, player_pos):
+    kind = "coins"
+    sprite_path = "assets/coin_sprite.png"
+    sprite_size = (16, 16)
+
+    def __init__(self, position):
         super().__init__()
         self.load_sprite()
         self.rect = self.image.get_rect()
-        angle = random.uniform(0, 2 * math.pi)
-        distance = random.uniform(WIDTH // 2, WIDTH)
-        self.rect.centerx = player_pos[0] + math.cos(angle) * distance
-        self.rect.centery = player_pos[1] + math.sin(angle) * distance
+        self.rect.centerx = position[0]
+        self.rect.centery = position[1]
 
     def load_sprite(self):
-        sprite_size = (16, 16)
-        try:
-            self.image = pygame.image.load("assets/coin_sprite.png").convert_alpha()
-            self.image = pygame.transform.scale(self.image, sprite_size)
-        except pygame.error:
-            print("Error loading coin_sprite.png. Using fallback sprite.")
-            self.image = pygame.Surface(sprite_size)
-            self.image.fill(GOLD)  # Use gold color for coin
-
-class Projectile(pygame.sprite.Sprite):
+        self.image = asset_cache.get(Coin.sprite_path, Coin.sprite_size, fallback=Coin.create_fallback_sprite)
+
+    @staticmethod
+    def create_fallback_sprite(sprite_size):
+        print("Error loading coin_sprite.png. Using fallback sprite.")
+        image = pygame.Surface(sprite_size)
+        image.fill(GOLD)  # Use gold color for coin
+        return image
+
+class Projectile(PooledSprite, MovingSprite):
+    kind = "projectiles"
+    sprite_path = "assets/projectile_sprite.png"
+    sprite_size = (16, 16)
+
     def __init__(self, x, y, dx, dy, damage, range):
         super().__init__()
         self.load_sprite()
         self.rect = self.image.get_rect()
-        self.rect.center = (x, y)
+        self.reset(x, y, dx, dy, damage, range)
+
+    def reset(self, x, y, dx, dy, damage, range):
+        self.place(x, y)
         self.dx = dx
         self.dy = dy
         self.damage = damage
         self.range = range
-        self.distance_traveled = 0
+        # Ticks until it has flown its range, expiry is scheduled instead of checked every tick
+        self.lifetime = math.ceil(range / math.hypot(dx, dy))
 
     def load_sprite(self):
-        sprite_size = (16, 16)
-        try:
-            self.image = pygame.image.load("assets/projectile_sprite.png").convert_alpha()
-            self.image = pygame.transform.scale(self.image, sprite_size)
-        except pygame.error:
-            print("Error loading projectile_sprite.png. Using fallback sprite.")
-            self.image = pygame.Surface(sprite_size)
-            self.image.fill(WHITE)  # Use white color for projectile
+        self.image = asset_cache.get(Projectile.sprite_path, Projectile.sprite_size, fallback=Projectile.create_fallback_sprite)
+
+    @staticmethod
+    def create_fallback_sprite(sprite_size):
+        print("Error loading projectile_sprite.png. Using fallback sprite.")
+        image = pygame.Surface(sprite_size)
+        image.fill(WHITE)  # Use white color for projectile
+        return image
 
     def update(self):
-        self.rect.x += self.dx
-        self.rect.y += self.dy
-        self.distance_traveled += math.hypot(self.dx, self.dy)
-        if self.distance_traveled >= self.range:
-            self.kill()
+        self.move_by(self.dx, self.dy)
+
+class MeleeAttack(PooledSprite):
+    kind = "melee_attacks"
+    sprite_path = "assets/melee_attack_sprite.png"
+    sprite_size = (64, 64)
+    alpha = 100
 
-class MeleeAttack(pygame.sprite.Sprite):
     def __init__(self, x, y, damage):
         super().__init__()
         self.load_sprite()
         self.rect = self.image.get_rect()
+        self.reset(x, y, damage)
+
+    def reset(self, x, y, damage):
         self.rect.center = (x, y)
         self.damage = damage
-        self.lifetime = 5
+        self.lifetime = MELEE_LIFETIME
 
     def load_sprite(self):
-        sprite_size = (64, 64)
-        try:
-            self.image = pygame.image.load("assets/melee_attack_sprite.png").convert_alpha()
-            self.image = pygame.transform.scale(self.image, sprite_size)
-        except pygame.error:
-            print("Error loading melee_attack_sprite.png. Using fallback sprite.")
-            self.image = pygame.Surface(sprite_size, pygame.SRCALPHA)
-            pygame.draw.circle(self.image, WHITE + (100,), (sprite_size[0]//2, sprite_size[1]//2), sprite_size[0]//2)
-        self.image.set_alpha(100)
+        self.image = MeleeAttack.get_sprite()
 
-    def update(self):
-        self.lifetime -= 1
-        if self.lifetime <= 0:
-            self.kill()
+    @staticmethod
+    def get_sprite():
+        return asset_cache.get(MeleeAttack.sprite_path, MeleeAttack.sprite_size, fallback=MeleeAttack.create_fallback_sprite,
+                               alpha=MeleeAttack.alpha)
+
+    @staticmethod
+    def create_fallback_sprite(sprite_size):
+        print("Error loading melee_attack_sprite.png. Using fallback sprite.")
+        image = pygame.Surface(sprite_size, pygame.SRCALPHA)
+        pygame.draw.circle(image, WHITE + (100,), (sprite_size[0]//2, sprite_size[1]//2), sprite_size[0]//2)
+        return image
+
+# Class-level pools so every spawn site shares the same free lists
+Enemy.pool = Pool(Enemy, ENEMY_POOL_SIZE)
+Projectile.pool = Pool(Projectile, PROJECTILE_POOL_SIZE)
+MeleeAttack.pool = Pool(MeleeAttack, MELEE_POOL_SIZE)
+
+def pool_stats():
+    return {
+        "enemies": Enemy.pool.stats(),
+        "projectiles": Projectile.pool.stats(),
+        "melee_attacks": MeleeAttack.pool.stats(),
+    }
 
+def preload_sprites():
+    for character_type in Player.sprite_paths:
+        Player.get_sprite(character_type)
+        Player.get_sprite(character_type, flip=True)
+    Enemy.get_sprite()
+    Enemy.get_sprite(flip=True)
+    for sprite_class in (Item, Coin, Projectile):
+        asset_cache.get(sprite_class.sprite_path, sprite_class.sprite_size, fallback=sprite_class.create_fallback_sprite)
+    MeleeAttack.get_sprite()
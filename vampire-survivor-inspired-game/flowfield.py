@@ -0,0 +1,71 @@
+import math
+
+NEAR_CELLS = 1  # Enemies this many cells from the player's cell steer straight at the player
+SEPARATION = 0.75  # Push per tick away from a full crowd, in pixels
+CROWD = 4  # Crowding past which the push stops growing
+
+class FlowCell:
+    __slots__ = ("members", "exact", "heading_x", "heading_y", "push_x", "push_y", "center_x", "center_y", "spring")
+
+class FlowField:
+    def __init__(self):
+        # The world has no obstacles, so the way to the player only depends on a cell's offset
+        # from the player's cell. Headings are memoized per offset and reused every tick
+        self.directions = {}
+        self.target = (0.0, 0.0)
+        self.cells = []
+
+    def rebuild(self, target_x, target_y, grid):
+        # Works out steering once per occupied cell of the enemy grid, which already buckets
+        # every enemy this tick, so no enemy is looked up or counted a second time
+        self.target = (target_x, target_y)
+        occupied = grid.cells
+        origin_x, origin_y = grid.cell_of(target_x, target_y)
+        spring_scale = SEPARATION / (CROWD * grid.cell_size * 0.5)
+        cells = self.cells
+        cells.clear()
+        for (cell_x, cell_y), members in occupied.items():
+            cell = FlowCell()
+            cell.members = members
+            offset_x, offset_y = cell_x - origin_x, cell_y - origin_y
+            # Close in, a cell-wide approximation would miss, so those enemies aim exactly
+            cell.exact = abs(offset_x) <= NEAR_CELLS and abs(offset_y) <= NEAR_CELLS
+            if not cell.exact:
+                cell.heading_x, cell.heading_y = self.direction((offset_x, offset_y))
+            # Down the crowding gradient to the neighbouring cells
+            push_x = len(occupied.get((cell_x - 1, cell_y), ())) - len(occupied.get((cell_x + 1, cell_y), ()))
+            push_y = len(occupied.get((cell_x, cell_y - 1), ())) - len(occupied.get((cell_x, cell_y + 1), ()))
+            length = math.hypot(push_x, push_y)
+            if length:
+                scale = SEPARATION * min(1.0, length / CROWD) / length
+                push_x *= scale
+                push_y *= scale
+            cell.push_x, cell.push_y = push_x, push_y
+            # And apart from the centroid of the cell, linear in distance so no enemy needs a sqrt
+            count = len(members)
+            if count > 1:
+                cell.center_x = sum(enemy.x for enemy in members) / count
+                cell.center_y = sum(enemy.y for enemy in members) / count
+                cell.spring = min(count - 1, CROWD) * spring_scale
+            else:
+                cell.center_x = cell.center_y = cell.spring = 0.0
+            cells.append(cell)
+
+    def direction(self, offset):
+        # Unit vector from the center of the cell at offset to the center of the origin cell
+        direction = self.directions.get(offset)
+        if direction is None:
+            length = math.hypot(offset[0], offset[1])
+            direction = self.directions[offset] = (-offset[0] / length, -offset[1] / length)
+        return direction
+
+    def aim(self, x, y):
+        dx = self.target[0] - x
+        dy = self.target[1] - y
+        dist = math.hypot(dx, dy)
+        if dist == 0:
+            return 0.0, 0.0
+        return dx / dist, dy / dist
+
+    def __len__(self):
+        return len(self.cells)
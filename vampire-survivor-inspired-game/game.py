@@ -1,15 +1,37 @@
 import pygame
 import time
 import random
-import json
 import os
 import math
-from constants import WIDTH, HEIGHT, WHITE, BLACK, GREEN, GOLD, RED, BLUE, WARRIOR, MAGE, ARCHER, SAVE_FILE
-from entities import Player, Enemy, Item, Coin, Projectile, MeleeAttack
-from ui import StartScreen, CharacterSelect, Shop, Statistics, Settings, Button
-
-CHUNK_SIZE = 800
-RENDER_DISTANCE = 2
+from constants import WIDTH, HEIGHT, WHITE, BLACK, GREEN, GOLD, RED, BLUE, WARRIOR, MAGE, ARCHER, SAVE_FILE, REPLAY_DIR, TICK_RATE, MAX_FPS
+from entities import Player, Enemy, Item, Coin, Projectile, preload_sprites, pool_stats, random_pickup_position
+from ui import StartScreen, CharacterSelect, Shop, Statistics, Settings, Button, text_cache
+from resources import asset_cache
+from spatial import SpatialHash, collision_radius
+from swarm import EnemySwarm
+from chunks import ChunkMap, CHUNK_SIZE
+from chunk_store import ChunkStore, KIND_ENEMY, KIND_ITEM, KIND_COIN
+from controls import KeyboardInput
+from replay import ReplayRecorder
+from profiler import Profiler
+from registry import EntityRegistry
+from timers import TimerWheel
+from pickups import PickupManager
+from flowfield import FlowField
+from render import TiledBackground, RenderQueue, FrameDiff, LAYER_PICKUPS, LAYER_ENEMIES, LAYER_ATTACKS, LAYER_PLAYER
+from persistence import SaveWriter, load_save, default_stats
+
+GRID_CELL_SIZE = 128
+# Stat gained per upgrade level, copied onto each Game so balance runs can override them
+UPGRADE_STEPS = {
+    "Health Up": 20,
+    "Speed Up": 0.5,
+    "Damage Up": 5,
+    "Attack Speed Up": 0.1,
+    "Cooldown Reduction": 0.05,
+}
+CULL_MARGIN = 64  # Covers sprites that moved since the enemy grid was rebuilt
+MAX_CATCH_UP_STEPS = 5  # Ticks simulated per frame at most, past that the game slows down instead
 
 class Camera:
     def __init__(self, width, height):
@@ -17,36 +39,36 @@ class Camera:
         self.width = width
         self.height = height
 
-    def apply(self, entity):
-        return pygame.Rect(entity.rect.x - self.camera.x, entity.rect.y - self.camera.y, entity.rect.width, entity.rect.height)
-
     def update(self, target):
         self.camera.x = target.rect.centerx - self.width // 2
         self.camera.y = target.rect.centery - self.height // 2
 
-class Chunk:
-    def __init__(self, x, y):
-        self.rect = pygame.Rect(x * CHUNK_SIZE, y * CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE)
-        self.enemies = pygame.sprite.Group()
-        self.items = pygame.sprite.Group()
-        self.coins = pygame.sprite.Group()
-
 class Game:
     upgrades = {}
 
-    def __init__(self, screen, clock, font):
+    def __init__(self, screen, clock, font, save_file=SAVE_FILE):
         self.screen = screen
         self.clock = clock
         self.font = font
-        self.all_sprites = pygame.sprite.Group()
-        self.enemies = pygame.sprite.Group()
-        self.items = pygame.sprite.Group()
-        self.coins = pygame.sprite.Group()
-        self.projectiles = pygame.sprite.Group()
-        self.melee_attacks = pygame.sprite.Group()
+        self.save_file = save_file  # None keeps the game from touching the save file
+        self.save_writer = SaveWriter(save_file) if save_file is not None else None  # Writes off the game thread
+        self.input_source = KeyboardInput()
+        self.rng = random.Random()  # All gameplay randomness goes through this so a seed replays a run
+        self.seed = None
+        self.ticks = 0
+        self.record_replays = False
+        self.recorder = None
+        self.enemy_grid = SpatialHash(GRID_CELL_SIZE)  # Rebuilt every tick, enemies always move
+        self.flow_field = FlowField()  # Shared steering toward the player, rebuilt from enemy_grid every tick
+        self.enemy_backend = "sprites"  # "swarm" simulates enemies as NumPy arrays instead of sprites
+        self.swarm = None
         self.player = None
         self.camera = Camera(WIDTH, HEIGHT)
-        self.chunks = {}
+        self.chunk_map = ChunkMap()
+        self.entities = EntityRegistry(self.chunk_map)  # The only place entities are stored
+        self.pickups = PickupManager(self.entities, GRID_CELL_SIZE)  # Caps, ages out and collects items and coins
+        self.chunk_store = ChunkStore()  # Evicted chunks are parked on disk until the player returns
+        self.threaded_chunks = True
         self.score = 0
         self.coins_collected = 0
         self.total_coins = 0
@@ -57,16 +79,29 @@ class Game:
         self.shop = Shop(font, Game.upgrades)
         self.statistics = Statistics(font)
         self.settings = Settings(font)
-        self.stats = {"Games Played": 0, "Total Score": 0, "Highest Score": 0}
-        Game.upgrades = {}
         self.load_game_data()
         self.quit_game = False
-        self.wave_timer = 0
+        self.timers = TimerWheel()  # Cooldowns, lifetimes and waves, in ticks
+        self.waves_started = False
         self.wave_interval = 5  # Spawn new wave every 5 seconds
-        self.game_start_time = 0
+        self.wave_size_base = 5
+        self.wave_size_cap = 20
+        self.upgrade_steps = dict(UPGRADE_STEPS)
         self.load_assets()
         self.show_hitboxes = False
-        self.background = self.create_background()
+        self.profiler = Profiler()
+        self.visible_layers = [[], [], [], []]  # Culled sprites per render layer
+        self.render_queue = RenderQueue()
+        self.draw_stats = {"drawn": 0, "culled": 0}
+        self.background = TiledBackground()
+        self.needs_redraw = True  # Menus are only redrawn after something happened
+        self.menu_diff = FrameDiff()  # And only the parts a redraw changed are pushed
+        self.alpha = 1.0
+        self.view_offset = (0, 0)
+        self.accumulator = 0.0
+        # Positions before the latest tick, draw() blends from these to the current ones
+        self.previous_positions = {}
+        self.previous_camera = (0, 0)
 
     def load_assets(self):
         # Ensure the assets directory exists
@@ -93,25 +128,38 @@ class Game:
                 pygame.image.save(image, f"assets/{sprite_name}")
                 print(f"Created placeholder for {sprite_name}")
 
-    def create_background(self):
-        background = pygame.Surface((CHUNK_SIZE, CHUNK_SIZE))
-        small_rect_size = 50
-        colors = [(100, 100, 100), (80, 80, 80)]
-        for y in range(0, CHUNK_SIZE, small_rect_size):
-            for x in range(0, CHUNK_SIZE, small_rect_size):
-                rect = pygame.Rect(x, y, small_rect_size, small_rect_size)
-                color = colors[(x // small_rect_size + y // small_rect_size) % 2]
-                pygame.draw.rect(background, color, rect)
-        return background
+        # Decode and scale every sprite up front so spawning never touches the disk
+        preload_sprites()
 
     def run(self):
         self.quit_game = False
+        self.needs_redraw = True
+        dt = 1 / TICK_RATE
         while not self.quit_game:
-            self.clock.tick(60)
-            self.handle_events()
-            self.update()
-            self.draw()
-            pygame.display.flip()
+            # The simulation advances in fixed ticks however long the frame took to render
+            self.accumulator += self.clock.tick(MAX_FPS) / 1000
+            self.profiler.begin_frame()
+            with self.profiler.section("events"):
+                self.handle_events()
+            with self.profiler.section("update"):
+                steps = int(self.accumulator / dt)
+                if steps > MAX_CATCH_UP_STEPS:
+                    steps = MAX_CATCH_UP_STEPS
+                    self.accumulator = steps * dt  # Drop the backlog rather than spiral
+                for step in range(steps):
+                    if step == steps - 1:
+                        self.snapshot_positions()
+                    self.update()
+                self.accumulator -= steps * dt
+            with self.profiler.section("draw"):
+                dirty_rects = self.draw(self.accumulator / dt)
+            with self.profiler.section("flip"):
+                if dirty_rects is None:
+                    pygame.display.flip()
+                elif dirty_rects:
+                    pygame.display.update(dirty_rects)
+            asset_cache.end_frame()
+            self.profiler.end_frame()
         return False  # Indicate that the game should close
 
     def handle_events(self):
@@ -119,6 +167,10 @@ class Game:
             if event.type == pygame.QUIT:
                 self.quit_game = True
                 return
+            if event.type != pygame.MOUSEMOTION:
+                self.needs_redraw = True
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.menu_diff.reset()  # The window lost its contents, push all of it
 
             if self.current_screen == "menu":
                 result = self.start_screen.handle_event(event)
@@ -127,6 +179,10 @@ class Game:
             elif self.current_screen == "character_select":
                 character_type = self.character_select.handle_event(event)
                 if character_type:
+                    if self.record_replays:
+                        self.input_source = ReplayRecorder(KeyboardInput())
+                    elif isinstance(self.input_source, ReplayRecorder):
+                        self.input_source = self.input_source.input_source
                     self.reset_game(character_type)
                     self.current_screen = "game"
             elif self.current_screen == "shop":
@@ -156,9 +212,17 @@ class Game:
                 result = self.settings.handle_event(event, self.show_hitboxes)
                 if result == "toggle_hitboxes":
                     self.show_hitboxes = not self.show_hitboxes
+                elif result == "toggle_profiler":
+                    self.profiler.enabled = not self.profiler.enabled
+                    self.profiler.reset()
+                elif result == "toggle_replays":
+                    self.record_replays = not self.record_replays
                 elif result == "menu":
                     self.current_screen = "menu"
             elif self.current_screen == "game":
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F9 and self.profiler.enabled:
+                    path = self.profiler.dump_trace(f"trace_{time.strftime('%Y%m%d_%H%M%S')}.json")
+                    print(f"Profiler trace written to {path}")
                 if self.game_over and event.type == pygame.MOUSEBUTTONDOWN:
                     if self.restart_button.is_clicked(event.pos):
                         self.current_screen = "character_select"
@@ -166,98 +230,189 @@ class Game:
                         self.current_screen = "menu"
 
     def update(self):
+        # Advances the world by one fixed tick, all timing is counted in ticks
         if self.current_screen == "game" and not self.game_over and self.player:
-            keys = pygame.key.get_pressed()
-            dx = keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]
-            dy = keys[pygame.K_DOWN] - keys[pygame.K_UP]
+            dx, dy = self.input_source.read(self)
             self.player.move(dx, dy)
 
             self.camera.update(self.player)
 
-            current_time = time.time()
-            self.wave_timer += self.clock.get_time() / 1000  # Convert to seconds
-
-            if self.wave_timer >= self.wave_interval:
-                self.spawn_enemy_wave()
-                self.wave_timer = 0
-
-            self.spawn_item()
-            self.spawn_coin()
-
-            new_attack = self.player.update(self.enemies)
-            if new_attack:
-                if isinstance(new_attack, Projectile):
-                    self.projectiles.add(new_attack)
-                    self.all_sprites.add(new_attack)
-                elif isinstance(new_attack, MeleeAttack):
-                    self.melee_attacks.add(new_attack)
-                    self.all_sprites.add(new_attack)
-
-            for enemy in self.enemies:
-                if pygame.sprite.collide_circle(self.player, enemy):
-                    self.player.health -= 10
-                    enemy.kill()
-                    if self.player.health <= 0:
-                        self.game_over = True
-                        self.total_coins += self.coins_collected
-                        self.stats["Games Played"] += 1
-                        self.stats["Total Score"] += self.score
-                        self.stats["Highest Score"] = max(self.stats["Highest Score"], self.score)
-                        self.save_game_data()
-
-            for item in pygame.sprite.spritecollide(self.player, self.items, True):
+            with self.profiler.section("spawn"):
+                if not self.waves_started:
+                    # Armed on the first tick so tunables set after reset_game still apply
+                    self.waves_started = True
+                    self.timers.schedule(self.wave_ticks(), self.wave_due)
+                self.spawn_item()
+                self.spawn_coin()
+
+            with self.profiler.section("targeting"):
+                if self.swarm is not None:
+                    new_attack = self.player.update(self.swarm)
+                else:
+                    self.enemy_grid.rebuild(self.entities.sprites("enemies"))
+                    new_attack = self.player.update(self.enemy_grid)
+                if new_attack:
+                    self.entities.add(new_attack, new_attack.kind)
+                    self.timers.schedule(new_attack.lifetime, self.expire, new_attack, new_attack.generation)
+                    self.timers.schedule(self.player.attack_interval, self.player.reload)
+
+            with self.profiler.section("collisions"):
+                self.resolve_collisions()
+            with self.profiler.section("sprites"):
+                self.update_sprites()
+            with self.profiler.section("timers"):
+                self.timers.advance()
+                self.pickups.despawn(self.ticks)
+            with self.profiler.section("chunks"):
+                self.update_chunks()
+            self.ticks += 1
+
+            if self.game_over and self.record_replays and isinstance(self.input_source, ReplayRecorder):
+                path = os.path.join(REPLAY_DIR, f"replay_{time.strftime('%Y%m%d_%H%M%S')}.vsr")
+                print(f"Replay written to {self.input_source.save(path, self)}")
+
+    def snapshot_positions(self):
+        if self.player is None:
+            return
+        positions = self.previous_positions
+        positions.clear()
+        positions[self.player] = self.player.rect.topleft
+        for sprite in self.entities.sprites("enemies") + self.entities.sprites("projectiles"):
+            positions[sprite] = sprite.rect.topleft
+        if self.swarm is not None:
+            self.swarm.snapshot()
+        self.previous_camera = self.camera.camera.topleft
+
+    def resolve_collisions(self):
+        self.resolve_enemy_contacts()
+        self.collect_pickups()
+        self.resolve_attacks()
+
+    def resolve_enemy_contacts(self):
+        if self.swarm is not None:
+            player_x, player_y = self.player.rect.center
+            contacts = self.swarm.in_circle(player_x, player_y, self.player.radius)
+            self.swarm.remove(contacts)
+            for _ in contacts:
+                self.hit_player(10)
+            return
+
+        for enemy in self.enemy_grid.collide_circle(self.player):
+            enemy.kill()
+            self.hit_player(10)
+
+    def collect_pickups(self):
+        for pickup in self.pickups.collect(*self.player.rect.center):
+            if isinstance(pickup, Item):
                 self.score += 10
-                self.player.experience += 10
-                if self.player.experience >= self.player.level * 100:
-                    self.player.level += 1
-                    self.player.experience = 0
-                    self.player.health = min(self.player.max_health, self.player.health + 20)
-
-            for coin in pygame.sprite.spritecollide(self.player, self.coins, True):
+                self.gain_experience(10)
+            else:
                 self.coins_collected += 1
 
-            for projectile in self.projectiles:
-                for enemy in pygame.sprite.spritecollide(projectile, self.enemies, False, pygame.sprite.collide_circle):
-                    if enemy.take_damage(projectile.damage):
-                        enemy.kill()
-                        self.score += 5
-                        self.player.experience += 5
-                        if self.player.experience >= self.player.level * 100:
-                            self.player.level += 1
-                            self.player.experience = 0
-                            self.player.health = min(self.player.max_health, self.player.health + 20)
-                    projectile.kill()
-
-            for melee_attack in self.melee_attacks:
-                for enemy in pygame.sprite.spritecollide(melee_attack, self.enemies, False, pygame.sprite.collide_circle):
-                    if enemy.take_damage(melee_attack.damage):
+    def resolve_attacks(self):
+        if self.swarm is not None:
+            for attack in self.entities.sprites("projectiles") + self.entities.sprites("melee_attacks"):
+                x, y = attack.rect.center
+                hits = self.swarm.in_circle(x, y, collision_radius(attack))
+                if len(hits):
+                    for _ in range(self.swarm.damage(hits, attack.damage)):
+                        self.register_kill()
+                    if isinstance(attack, Projectile):
+                        attack.kill()
+            return
+
+        for projectile in self.entities.sprites("projectiles"):
+            for enemy in self.enemy_grid.collide_circle(projectile):
+                if enemy.take_damage(projectile.damage):
+                    enemy.kill()
+                    self.register_kill()
+                projectile.kill()
+
+        for melee_attack in self.entities.sprites("melee_attacks"):
+            for enemy in self.enemy_grid.collide_circle(melee_attack):
+                if enemy.take_damage(melee_attack.damage):
+                    enemy.kill()
+                    self.register_kill()
+
+    def update_sprites(self):
+        if self.swarm is not None:
+            self.swarm.step(self.player.x, self.player.y)
+            self.swarm.cull()
+
+        # One pass per kind, pickups never move so they are never ticked.
+        # Enemies are stepped cell by cell of the grid built for targeting this tick, skipping
+        # the ones collisions killed since, and migrate chunks when they cross a border
+        self.flow_field.rebuild(self.player.x, self.player.y, self.enemy_grid)
+        for cell in self.flow_field.cells:
+            for enemy in cell.members:
+                if enemy.alive():
+                    enemy.update(self.flow_field, cell)
+                    if not self.chunk_map.relocate(enemy, "enemies"):
                         enemy.kill()
-                        self.score += 5
-                        self.player.experience += 5
-                        if self.player.experience >= self.player.level * 100:
-                            self.player.level += 1
-                            self.player.experience = 0
-                            self.player.health = min(self.player.max_health, self.player.health + 20)
-
-            # Update all sprites
-            for sprite in self.all_sprites:
-                if isinstance(sprite, Enemy):
-                    sprite.update(self.player)
-                elif sprite != self.player:
-                    sprite.update()
-
-            self.update_chunks()
-
-    def draw(self):
-        self.screen.fill(BLACK)
+
+        # Melee swings don't move, their expiry is a timer
+        for projectile in self.entities.sprites("projectiles"):
+            projectile.update()
+
+    def expire(self, sprite, generation):
+        # A pooled sprite that died and came back since the timer was set has a new generation
+        if sprite.generation == generation:
+            sprite.kill()
+
+    def wave_ticks(self):
+        return round(self.wave_interval * TICK_RATE)
+
+    def wave_due(self):
+        self.spawn_enemy_wave()
+        self.timers.schedule(self.wave_ticks(), self.wave_due)
+
+    def hit_player(self, damage):
+        self.player.health -= damage
+        if self.player.health <= 0:
+            self.game_over = True
+            self.total_coins += self.coins_collected
+            self.stats["Games Played"] += 1
+            self.stats["Total Score"] += self.score
+            self.stats["Highest Score"] = max(self.stats["Highest Score"], self.score)
+            self.save_game_data()
+
+    def register_kill(self):
+        self.score += 5
+        self.gain_experience(5)
+
+    def gain_experience(self, amount):
+        self.player.experience += amount
+        if self.player.experience >= self.player.level * 100:
+            self.player.level += 1
+            self.player.experience = 0
+            self.player.health = min(self.player.max_health, self.player.health + 20)
+
+    def draw(self, alpha=1.0):
+        # Returns the rects to push to the display, None meaning the whole screen.
+        # alpha is how far the frame sits between the previous tick and the latest one
         if self.current_screen == "game":
+            self.alpha = alpha if not self.game_over else 1.0
+            camera_x, camera_y = self.camera.camera.topleft
+            self.view_offset = self.blend(self.previous_camera, camera_x, camera_y)
             self.draw_background()
-            for sprite in self.all_sprites:
-                self.screen.blit(sprite.image, self.camera.apply(sprite))
+            self.visible_layers = self.cull_sprites()
+            self.render_queue.clear()
+            for layer, sprites in enumerate(self.visible_layers):
+                self.queue_sprites(layer, sprites)
+            self.render_queue.submit(self.screen)
             if self.show_hitboxes:
                 self.draw_hitboxes()
             self.draw_ui()
-        elif self.current_screen == "menu":
+            if self.profiler.enabled:
+                self.draw_profiler()
+            self.menu_diff.reset()
+            return None
+
+        # Menu screens are static, skip both drawing and the display update until an event arrives
+        if not self.needs_redraw:
+            return []
+        self.needs_redraw = False
+        if self.current_screen == "menu":
             self.start_screen.draw(self.screen)
         elif self.current_screen == "character_select":
             self.character_select.draw(self.screen)
@@ -266,28 +421,95 @@ class Game:
         elif self.current_screen == "stats":
             self.statistics.draw(self.screen, self.stats)
         elif self.current_screen == "settings":
-            self.settings.draw(self.screen, self.show_hitboxes)
+            self.settings.draw(self.screen, self.show_hitboxes, self.profiler.enabled, self.record_replays)
+        return self.menu_diff.changed(self.screen, self.current_screen)
+
+    def cull_sprites(self):
+        # Only sprites touching the camera view (plus a margin) get drawn, layered bottom to top
+        view = self.camera.camera.inflate(CULL_MARGIN * 2, CULL_MARGIN * 2)
+        layers = [[], [], [], []]
+        layers[LAYER_PICKUPS] = [
+            sprite for sprite in self.pickups.grid.query_rect(view)
+            if sprite.alive() and view.colliderect(sprite.rect)
+        ]
+        if self.swarm is not None:
+            enemies = self.swarm.materialize(view, self.alpha)
+            total = self.entities.total() + len(self.swarm) + 1
+        else:
+            enemies = [
+                sprite for sprite in self.enemy_grid.query_rect(view)
+                if sprite.alive() and view.colliderect(sprite.rect)
+            ]
+            total = self.entities.total() + 1
+        enemies.sort(key=lambda sprite: sprite.rect.bottom)
+        layers[LAYER_ENEMIES] = enemies
+        for group in (self.entities.projectiles, self.entities.melee_attacks):
+            layers[LAYER_ATTACKS].extend(sprite for sprite in group if view.colliderect(sprite.rect))
+        layers[LAYER_PLAYER].append(self.player)
+
+        drawn = sum(len(sprites) for sprites in layers)
+        self.draw_stats["drawn"] = drawn
+        self.draw_stats["culled"] = total - drawn
+        return layers
+
+    def queue_sprites(self, layer, sprites):
+        offset_x, offset_y = self.view_offset
+        previous = self.previous_positions
+        if self.alpha >= 1 or not previous:
+            # Nothing to blend, positions come straight off the rects
+            offset_x, offset_y = round(offset_x), round(offset_y)
+            self.render_queue.extend(layer, [
+                (sprite.image, (sprite.rect.x - offset_x, sprite.rect.y - offset_y)) for sprite in sprites
+            ])
+            return
+        self.render_queue.extend(layer, [(sprite.image, self.screen_position(sprite)) for sprite in sprites])
+
+    def blend(self, previous, x, y):
+        if previous is None or self.alpha >= 1:
+            return x, y
+        return previous[0] + (x - previous[0]) * self.alpha, previous[1] + (y - previous[1]) * self.alpha
+
+    def screen_position(self, sprite):
+        # Sprites spawned during the latest tick have no previous position and draw where they are
+        x, y = self.blend(self.previous_positions.get(sprite), *sprite.rect.topleft)
+        return round(x - self.view_offset[0]), round(y - self.view_offset[1])
 
     def draw_background(self):
-        start_x = self.camera.camera.x % -CHUNK_SIZE
-        start_y = self.camera.camera.y % -CHUNK_SIZE
-
-        for y in range(start_y, HEIGHT, CHUNK_SIZE):
-            for x in range(start_x, WIDTH, CHUNK_SIZE):
-                self.screen.blit(self.background, (x, y))
+        # Opaque and covers the whole view, so the screen never needs clearing first
+        self.background.draw(self.screen, round(self.view_offset[0]), round(self.view_offset[1]))
 
     def draw_hitboxes(self):
-        for sprite in self.all_sprites:
+        for sprite in (sprite for sprites in self.visible_layers for sprite in sprites):
             if hasattr(sprite, 'radius'):
-                hitbox_rect = self.camera.apply(sprite)
-                pygame.draw.circle(self.screen, RED, hitbox_rect.center, sprite.radius, 1)
+                x, y = self.screen_position(sprite)
+                center = (x + sprite.rect.width // 2, y + sprite.rect.height // 2)
+                pygame.draw.circle(self.screen, RED, center, sprite.radius, 1)
+
+    def draw_profiler(self):
+        enemies = len(self.swarm) if self.swarm is not None else self.entities.count("enemies")
+        sprite_cache = asset_cache.stats()
+        text_stats = text_cache.stats()
+        self.profiler.draw(self.screen, [
+            f"entities: {self.entities.total()}  enemies: {enemies}",
+            f"sprite cache: {sprite_cache['hits']} hits  {sprite_cache['misses']} misses  {sprite_cache['hit_rate']:.1%}",
+            f"text cache: {text_stats['hits']} hits  {text_stats['misses']} misses  {text_stats['hit_rate']:.1%}",
+            f"surface allocs/frame: {asset_cache.frame_allocations}  overlay: {asset_cache.frame_overlay_allocations}",
+            f"draws: {self.draw_stats['drawn']}  culled: {self.draw_stats['culled']}",
+            f"timers pending: {self.timers.pending}",
+            f"flow cells: {len(self.flow_field)}  headings: {len(self.flow_field.directions)}",
+            f"pickups: {len(self.pickups)}  ageing: {len(self.pickups.expiry)}",
+        ] + [
+            f"{name} pool: {stats['reuse_rate']:.0%} reused, {stats['free']} free"
+            for name, stats in pool_stats().items()
+        ])
 
     def draw_ui(self):
-        health_text = self.font.render(f"Health: {self.player.health}/{self.player.max_health}", True, WHITE)
-        score_text = self.font.render(f"Score: {self.score}", True, WHITE)
-        coins_text = self.font.render(f"Coins: {self.coins_collected}", True, GOLD)
-        level_text = self.font.render(f"Level: {self.player.level}", True, WHITE)
-        exp_text = self.font.render(f"EXP: {self.player.experience}/{self.player.level * 100}", True, WHITE)
+        # Cached by string, so a field is only re-rendered when its value changes
+        health_text = text_cache.render(self.font, f"Health: {self.player.health}/{self.player.max_health}", WHITE)
+        score_text = text_cache.render(self.font, f"Score: {self.score}", WHITE)
+        coins_text = text_cache.render(self.font, f"Coins: {self.coins_collected}", GOLD)
+        level_text = text_cache.render(self.font, f"Level: {self.player.level}", WHITE)
+        exp_text = text_cache.render(self.font, f"EXP: {self.player.experience}/{self.player.level * 100}", WHITE)
 
         self.screen.blit(health_text, (10, 10))
         self.screen.blit(score_text, (10, 40))
@@ -296,137 +518,174 @@ class Game:
         self.screen.blit(exp_text, (10, 130))
 
         # Draw timer
-        elapsed_time = int(time.time() - self.game_start_time)
+        elapsed_time = self.ticks // TICK_RATE
         minutes, seconds = divmod(elapsed_time, 60)
-        timer_text = self.font.render(f"{minutes:02d}:{seconds:02d}", True, WHITE)
+        timer_text = text_cache.render(self.font, f"{minutes:02d}:{seconds:02d}", WHITE)
         timer_rect = timer_text.get_rect(center=(WIDTH // 2, 30))
         self.screen.blit(timer_text, timer_rect)
 
         if self.game_over:
-            game_over_text = self.font.render("Game Over", True, RED)
+            game_over_text = text_cache.render(self.font, "Game Over", RED)
             self.screen.blit(game_over_text, (WIDTH // 2 - game_over_text.get_width() // 2, HEIGHT // 2 - 50))
             self.restart_button.draw(self.screen)
             self.menu_button.draw(self.screen)
 
     def spawn_enemy_wave(self):
-        num_enemies = min(5 + self.player.level, 20)  # Increase enemies with player level, max 20
+        num_enemies = min(self.wave_size_base + self.player.level, self.wave_size_cap)  # Increase enemies with player level
+        if self.swarm is not None:
+            positions, speeds = [], []
+            for _ in range(num_enemies):
+                positions.append(self.get_spawn_position())
+                speeds.append(self.rng.uniform(1, 3))
+            self.swarm.spawn(positions, speeds)
+            return
         for _ in range(num_enemies):
-            enemy = Enemy(self.get_spawn_position())
-            chunk = self.get_chunk(enemy.rect.centerx, enemy.rect.centery)
-            chunk.enemies.add(enemy)
-            self.enemies.add(enemy)
-            self.all_sprites.add(enemy)
+            position = self.get_spawn_position()
+            self.add_enemy(Enemy.spawn(position, self.rng.uniform(1, 3)))
+
+    def add_enemy(self, enemy):
+        if not self.entities.add(enemy, "enemies"):
+            enemy.kill()
 
     def get_spawn_position(self):
-        angle = random.uniform(0, 2 * math.pi)
-        distance = random.uniform(WIDTH, WIDTH * 1.5)
+        angle = self.rng.uniform(0, 2 * math.pi)
+        distance = self.rng.uniform(WIDTH, WIDTH * 1.5)
         x = self.player.rect.centerx + math.cos(angle) * distance
         y = self.player.rect.centery + math.sin(angle) * distance
         return x, y
 
     def spawn_item(self):
-        if random.random() < 0.02:
-            item = Item(self.player.rect.center if self.player else None)
-            chunk = self.get_chunk(item.rect.centerx, item.rect.centery)
-            chunk.items.add(item)
-            self.items.add(item)
-            self.all_sprites.add(item)
+        if self.rng.random() < 0.02:
+            position = random_pickup_position(self.player.rect.center, self.rng)
+            if self.pickups.has_room(position):
+                self.pickups.add(Item(position), self.ticks)
 
     def spawn_coin(self):
-        if random.random() < 0.01:
-            coin = Coin(self.player.rect.center if self.player else None)
-            chunk = self.get_chunk(coin.rect.centerx, coin.rect.centery)
-            chunk.coins.add(coin)
-            self.coins.add(coin)
-            self.all_sprites.add(coin)
-
-    def get_chunk(self, x, y):
-        chunk_x = int(x // CHUNK_SIZE)
-        chunk_y = int(y // CHUNK_SIZE)
-        if (chunk_x, chunk_y) not in self.chunks:
-            self.chunks[(chunk_x, chunk_y)] = Chunk(chunk_x, chunk_y)
-        return self.chunks[(chunk_x, chunk_y)]
+        if self.rng.random() < 0.01:
+            position = random_pickup_position(self.player.rect.center, self.rng)
+            if self.pickups.has_room(position):
+                self.pickups.add(Coin(position), self.ticks)
 
     def update_chunks(self):
-        player_chunk_x = int(self.player.rect.centerx // CHUNK_SIZE)
-        player_chunk_y = int(self.player.rect.centery // CHUNK_SIZE)
-
-        for dx in range(-RENDER_DISTANCE, RENDER_DISTANCE + 1):
-            for dy in range(-RENDER_DISTANCE, RENDER_DISTANCE + 1):
-                chunk_x = player_chunk_x + dx
-                chunk_y = player_chunk_y + dy
-                if (chunk_x, chunk_y) not in self.chunks:
-                    self.chunks[(chunk_x, chunk_y)] = Chunk(chunk_x, chunk_y)
-
-        # Remove far chunks
-        chunks_to_remove = []
-        for chunk_pos, chunk in self.chunks.items():
-            if (abs(chunk_pos[0] - player_chunk_x) > RENDER_DISTANCE or
-                abs(chunk_pos[1] - player_chunk_y) > RENDER_DISTANCE):
-                chunks_to_remove.append(chunk_pos)
-
-        for chunk_pos in chunks_to_remove:
-            chunk = self.chunks.pop(chunk_pos)
-            self.enemies.remove(chunk.enemies)
-            self.items.remove(chunk.items)
-            self.coins.remove(chunk.coins)
-            self.all_sprites.remove(chunk.enemies, chunk.items, chunk.coins)
-
-    def reset_game(self, character_type):
-        self.all_sprites.empty()
-        self.enemies.empty()
-        self.items.empty()
-        self.coins.empty()
-        self.projectiles.empty()
-        self.melee_attacks.empty()
-        self.chunks.clear()
+        for key, records in self.chunk_store.poll():
+            self.restore_chunk(key, records)
+
+        created, evicted = self.chunk_map.recenter(*self.player.rect.center)
+        # Eviction only touches the sprites that live in the evicted chunks
+        for chunk in evicted:
+            self.store_chunk(chunk)
+            for enemy in chunk.enemies.sprites():
+                enemy.kill()  # Returns it to the enemy pool
+            for pickup in chunk.items.sprites() + chunk.coins.sprites():
+                self.pickups.remove(pickup)
+        for key in created:
+            self.chunk_store.load(key)
+
+        if evicted and self.swarm is not None:
+            self.swarm.remove_outside(*self.chunk_map.bounds())
+
+    def store_chunk(self, chunk):
+        left, top = chunk.rect.topleft
+        # Health is packed as a 16-bit int, fractional damage rounds in the enemy's favour
+        records = [
+            (KIND_ENEMY, enemy.rect.centerx - left, enemy.rect.centery - top, math.ceil(enemy.health), enemy.speed)
+            for enemy in chunk.enemies
+        ]
+        # Pickups keep the ticks they have left in the health field
+        records.extend((KIND_ITEM, item.rect.centerx - left, item.rect.centery - top, self.pickups.remaining(item, self.ticks), 0)
+                       for item in chunk.items)
+        records.extend((KIND_COIN, coin.rect.centerx - left, coin.rect.centery - top, self.pickups.remaining(coin, self.ticks), 0)
+                       for coin in chunk.coins)
+        if records:
+            self.chunk_store.save(chunk.key, records)
+
+    def restore_chunk(self, key, records):
+        if key not in self.chunk_map.chunks:
+            # The player left again before the load finished, park it back on disk
+            # next to anything saved for the chunk while it was briefly live
+            if key in self.chunk_store.stored:
+                self.chunk_store.merge(key, records)
+            else:
+                self.chunk_store.save(key, records)
+            return
+        left, top = key[0] * CHUNK_SIZE, key[1] * CHUNK_SIZE
+        for kind, x, y, health, speed in records:
+            position = (left + x, top + y)
+            if kind == KIND_ENEMY:
+                enemy = Enemy.spawn(position, speed)
+                enemy.health = health
+                self.add_enemy(enemy)
+            elif kind == KIND_ITEM:
+                self.pickups.add(Item(position), self.ticks, health)
+            else:
+                self.pickups.add(Coin(position), self.ticks, health)
+
+    def reset_game(self, character_type, seed=None):
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.rng.seed(self.seed)
+        self.ticks = 0
+        if isinstance(self.input_source, ReplayRecorder):
+            self.input_source.start(self.seed, character_type, self.enemy_backend, Game.upgrades)
+        self.entities.clear()
+        self.enemy_grid.clear()
+        self.pickups.clear()
+        self.chunk_store.clear()
+        # Background loads land on whichever tick they finish, recorded runs stream synchronously
+        threaded = self.threaded_chunks and not isinstance(self.input_source, ReplayRecorder)
+        if self.chunk_store.threaded != threaded:
+            self.chunk_store.close()
+            self.chunk_store = ChunkStore(threaded=threaded)
+        self.swarm = EnemySwarm() if self.enemy_backend == "swarm" else None
         self.player = Player(character_type)
-        self.all_sprites.add(self.player)
+        self.chunk_map.recenter(*self.player.rect.center)
         self.camera = Camera(WIDTH, HEIGHT)
         self.camera.update(self.player)  # Center the camera on the player
         self.score = 0
         self.coins_collected = 0
         self.game_over = False
-        self.wave_timer = 0
-        self.game_start_time = time.time()
+        self.timers.clear()
+        self.waves_started = False
+        self.accumulator = 0.0
+        self.previous_positions.clear()
+        self.previous_camera = self.camera.camera.topleft
         self.apply_upgrades()
         self.restart_button = Button(WIDTH // 2 - 100, HEIGHT // 2, 200, 50, "Restart", GREEN, BLACK)
         self.menu_button = Button(WIDTH // 2 - 100, HEIGHT // 2 + 70, 200, 50, "Main Menu", GREEN, BLACK)
 
     def load_game_data(self):
-        try:
-            with open(SAVE_FILE, 'r') as f:
-                data = json.load(f)
-                self.total_coins = int(data.get('total_coins', 0))
-                self.stats = data.get('stats', {"Games Played": 0, "Total Score": 0, "Highest Score": 0})
-                Game.upgrades =Game.upgrades = data.get('upgrades', {})
-                self.shop.upgrades = Game.upgrades
-        except FileNotFoundError:
-            self.total_coins = 0
-            self.stats = {"Games Played": 0, "Total Score": 0, "Highest Score": 0}
-            Game.upgrades = {}
-
+        data = load_save(self.save_file) if self.save_file is not None else {}
+        self.total_coins = int(data.get('total_coins', 0))
+        self.stats = data.get('stats', default_stats())
+        Game.upgrades = data.get('upgrades', {})
         # Ensure all upgrade types exist in Game.upgrades
         for item in self.shop.items:
-            if item['name'] not in Game.upgrades:
-                Game.upgrades[item['name']] = 0
+            Game.upgrades.setdefault(item['name'], 0)
+        self.shop.upgrades = Game.upgrades
+        self.shop.update_buttons()
 
     def save_game_data(self):
-        data = {
+        if self.save_writer is None:
+            return
+        self.save_writer.save({
             'total_coins': self.total_coins,
             'stats': self.stats,
             'upgrades': self.shop.upgrades
-        }
-        with open(SAVE_FILE, 'w') as f:
-            json.dump(data, f)
+        })
+
+    def close(self):
+        # Waits for the last save to reach the disk
+        if self.save_writer is not None:
+            self.save_writer.close()
+        self.chunk_store.close()
 
     def apply_upgrades(self):
         if self.player:
-            self.player.max_health = 100 + Game.upgrades.get("Health Up", 0) * 20
+            steps = self.upgrade_steps
+            self.player.max_health = 100 + Game.upgrades.get("Health Up", 0) * steps["Health Up"]
             self.player.health = self.player.max_health
-            self.player.speed = 5 + Game.upgrades.get("Speed Up", 0) * 0.5
-            self.player.damage = 10 + Game.upgrades.get("Damage Up", 0) * 5
-            self.player.attack_speed = 1.0 + Game.upgrades.get("Attack Speed Up", 0) * 0.1
-            self.player.cooldown_reduction = Game.upgrades.get("Cooldown Reduction", 0) * 0.05
+            self.player.speed = 5 + Game.upgrades.get("Speed Up", 0) * steps["Speed Up"]
+            self.player.damage = 10 + Game.upgrades.get("Damage Up", 0) * steps["Damage Up"]
+            self.player.attack_speed = 1.0 + Game.upgrades.get("Attack Speed Up", 0) * steps["Attack Speed Up"]
+            self.player.cooldown_reduction = Game.upgrades.get("Cooldown Reduction", 0) * steps["Cooldown Reduction"]
             self.player.set_attack_interval()
 
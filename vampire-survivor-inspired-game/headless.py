@@ -0,0 +1,87 @@
+import os
+import argparse
+import json
+import time
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # The run summary on stdout is JSON
+import pygame
+from constants import WIDTH, HEIGHT, WARRIOR, MAGE, ARCHER, TICK_RATE
+from controls import ScriptedInput
+from replay import ReplayRecorder
+from ui import text_cache
+from game import Game
+
+def init_headless_display():
+    # convert_alpha() needs a display mode, the dummy driver provides one without a window
+    if pygame.display.get_surface() is None:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        pygame.display.init()
+        pygame.display.set_mode((1, 1))
+    pygame.font.init()
+
+class HeadlessEngine:
+    def __init__(self, character_type, input_source=None, enemy_backend="sprites", seed=None, upgrades=None):
+        init_headless_display()
+        self.ticks = 0
+        self.game = Game(pygame.Surface((WIDTH, HEIGHT)), pygame.time.Clock(), text_cache.get_font(None, 36), save_file=None)
+        self.game.input_source = input_source or ScriptedInput([])
+        self.game.enemy_backend = enemy_backend
+        self.game.threaded_chunks = False  # Synchronous chunk streaming keeps seeded runs reproducible
+        if upgrades:
+            Game.upgrades.update(upgrades)
+        self.game.reset_game(character_type, seed)
+        self.game.current_screen = "game"
+
+    def step(self):
+        self.game.update()
+        self.ticks += 1
+
+    def run(self, max_ticks):
+        while self.ticks < max_ticks and not self.game.game_over:
+            self.step()
+        return self.summary()
+
+    def summary(self):
+        game = self.game
+        enemies = len(game.swarm) if game.swarm is not None else game.entities.count("enemies")
+        return {
+            "character": game.player.character_type,
+            "seed": game.seed,
+            "ticks": self.ticks,
+            "survival_time": self.ticks / TICK_RATE,
+            "game_over": game.game_over,
+            "score": game.score,
+            "coins": game.coins_collected,
+            "level": game.player.level,
+            "health": game.player.health,
+            "enemies": enemies,
+        }
+
+def parse_segment(text):
+    dx, dy, ticks = text.split(",")
+    return int(dx), int(dy), int(ticks)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the simulation without a window on a fixed timestep")
+    parser.add_argument("--character", choices=[WARRIOR, MAGE, ARCHER], default=WARRIOR)
+    parser.add_argument("--ticks", type=int, default=60 * 60)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--backend", choices=["sprites", "swarm"], default="sprites")
+    parser.add_argument("--script", nargs="*", type=parse_segment, default=[(1, 0, 90), (0, 1, 90), (-1, 0, 90), (0, -1, 90)],
+                        help="Movement segments as dx,dy,ticks, looped until the run ends")
+    parser.add_argument("--record", help="Write the run to this replay file")
+    args = parser.parse_args()
+
+    input_source = ScriptedInput(args.script, loop=True)
+    if args.record:
+        input_source = ReplayRecorder(input_source)
+    engine = HeadlessEngine(args.character, input_source, enemy_backend=args.backend, seed=args.seed)
+    start = time.perf_counter()
+    summary = engine.run(args.ticks)
+    elapsed = time.perf_counter() - start
+    summary["ticks_per_second"] = engine.ticks / elapsed if elapsed else 0.0
+    if args.record:
+        summary["replay"] = input_source.save(args.record, engine.game)
+    print(json.dumps(summary, indent=2))
+
+if __name__ == "__main__":
+    main()
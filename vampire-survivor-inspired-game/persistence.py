@@ -0,0 +1,73 @@
+import atexit
+import json
+import os
+import threading
+
+def default_stats():
+    return {"Games Played": 0, "Total Score": 0, "Highest Score": 0}
+
+def load_save(path):
+    # A missing or unreadable file starts a fresh profile instead of crashing the menu
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except ValueError:
+        print(f"Ignoring unreadable save file {path}")
+        return {}
+
+def write_atomic(path, payload):
+    # Readers see either the old file or the new one, never a half-written mix
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+class SaveWriter:
+    def __init__(self, path, threaded=True):
+        self.path = path
+        self.pending = None
+        self.closed = False
+        self.condition = threading.Condition()
+        self.worker = None
+        if threaded:
+            self.worker = threading.Thread(target=self.work, name="save-writer", daemon=True)
+            self.worker.start()
+            atexit.register(self.close)
+
+    def save(self, data):
+        # Serialized here so later changes to the game state can't leak into the snapshot,
+        # saves that arrive before the worker gets to them replace each other
+        payload = json.dumps(data)
+        if self.worker is None:
+            write_atomic(self.path, payload)
+            return
+        with self.condition:
+            self.pending = payload
+            self.condition.notify_all()
+
+    def close(self):
+        if self.worker is None:
+            return
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.worker.join()
+        self.worker = None
+        atexit.unregister(self.close)
+
+    def work(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closed:
+                    self.condition.wait()
+                if self.pending is None:
+                    return
+                payload, self.pending = self.pending, None
+            try:
+                write_atomic(self.path, payload)
+            except OSError as error:
+                print(f"Failed to write {self.path}: {error}")
@@ -0,0 +1,72 @@
+import bisect
+from collections import deque
+from constants import TICK_RATE
+from spatial import SpatialHash
+
+PICKUP_LIFETIME = 60 * TICK_RATE  # Ticks an uncollected pickup stays in the world
+PICKUPS_PER_CHUNK = 8  # Items and coins together, spawns into a full chunk are dropped
+MAGNET_RADIUS = 48  # Pickups whose center is this close to the player's are collected
+
+class PickupManager:
+    def __init__(self, entities, cell_size):
+        # Owns the items and coins: the spatial lookup used to collect and draw them, and a
+        # FIFO of (expiry tick, serial, pickup) so despawning only ever looks at the oldest
+        self.entities = entities
+        self.grid = SpatialHash(cell_size)
+        self.expiry = deque()
+        self.serial = 0
+
+    def has_room(self, position):
+        chunk_map = self.entities.chunk_map
+        chunk = chunk_map.chunks.get(chunk_map.key_of(*position))
+        return chunk is None or len(chunk.items) + len(chunk.coins) < PICKUPS_PER_CHUNK
+
+    def add(self, pickup, tick, lifetime=PICKUP_LIFETIME):
+        if not self.has_room(pickup.rect.center) or not self.entities.add(pickup, pickup.kind):
+            return False
+        self.grid.insert(pickup)
+        pickup.expires = tick + max(1, lifetime)
+        self.serial += 1
+        entry = (pickup.expires, self.serial, pickup)
+        if self.expiry and entry[0] < self.expiry[-1][0]:
+            # Only pickups restored from disk with part of their life spent land out of order
+            bisect.insort(self.expiry, entry)
+        else:
+            self.expiry.append(entry)
+        return True
+
+    def remove(self, pickup):
+        # Its FIFO entry is dropped lazily once it reaches the front
+        self.grid.remove(pickup)
+        pickup.kill()
+
+    def remaining(self, pickup, tick):
+        return max(1, pickup.expires - tick)
+
+    def despawn(self, tick):
+        expired = 0
+        while self.expiry and self.expiry[0][0] <= tick:
+            pickup = self.expiry.popleft()[2]
+            if pickup.alive():
+                self.remove(pickup)
+                expired += 1
+        return expired
+
+    def collect(self, x, y):
+        # One radius sweep through the grid around the player
+        reach = MAGNET_RADIUS * MAGNET_RADIUS
+        collected = []
+        for pickup in self.grid.query_circle(x, y, MAGNET_RADIUS):
+            dx = pickup.rect.centerx - x
+            dy = pickup.rect.centery - y
+            if pickup.alive() and dx * dx + dy * dy <= reach:
+                self.remove(pickup)
+                collected.append(pickup)
+        return collected
+
+    def clear(self):
+        self.grid.clear()
+        self.expiry.clear()
+
+    def __len__(self):
+        return len(self.grid.keys)
@@ -0,0 +1,41 @@
+class Pool:
+    def __init__(self, factory, max_size):
+        self.factory = factory
+        self.max_size = max_size  # High-water mark, instances released past it are left to the GC
+        self.free = []
+        self.created = 0
+        self.reused = 0
+        self.released = 0
+        self.dropped = 0
+
+    def acquire(self, *args):
+        if self.free:
+            instance = self.free.pop()
+            instance.reset(*args)
+            self.reused += 1
+        else:
+            instance = self.factory(*args)
+            self.created += 1
+        instance.pooled = False
+        return instance
+
+    def release(self, instance):
+        if instance.pooled:
+            return
+        instance.pooled = True
+        if len(self.free) < self.max_size:
+            self.free.append(instance)
+            self.released += 1
+        else:
+            self.dropped += 1
+
+    def stats(self):
+        acquired = self.created + self.reused
+        return {
+            "created": self.created,
+            "reused": self.reused,
+            "released": self.released,
+            "dropped": self.dropped,
+            "free": len(self.free),
+            "reuse_rate": self.reused / acquired if acquired else 0.0,
+        }
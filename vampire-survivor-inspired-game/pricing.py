@@ -0,0 +1,34 @@
+import bisect
+
+class CostTable:
+    def __init__(self, base_cost, growth=1.5):
+        self.base_cost = base_cost
+        self.growth = growth
+        # prefix[n] is the total paid for the first n levels, extended on demand
+        self.prefix = [0]
+
+    def level_cost(self, level):
+        return int(self.base_cost * (self.growth ** level))
+
+    def extend(self, levels):
+        prefix = self.prefix
+        while len(prefix) <= levels:
+            prefix.append(prefix[-1] + self.level_cost(len(prefix) - 1))
+
+    def cost(self, level, count=1):
+        # Price of going from level to level + count
+        self.extend(level + count)
+        return self.prefix[level + count] - self.prefix[level]
+
+    def refund(self, level):
+        self.extend(level)
+        return self.prefix[level]
+
+    def affordable(self, level, coins, limit=None):
+        # How many levels past level the coins cover, costs grow geometrically so the table stays short
+        self.extend(level)
+        budget = self.prefix[level] + coins
+        while self.prefix[-1] <= budget and (limit is None or len(self.prefix) <= level + limit):
+            self.extend(len(self.prefix))
+        count = bisect.bisect_right(self.prefix, budget) - 1 - level
+        return count if limit is None else min(count, limit)
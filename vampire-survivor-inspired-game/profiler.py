@@ -0,0 +1,149 @@
+import json
+import time
+from collections import deque
+import pygame
+from constants import WHITE, GREEN, RED, GOLD
+from ui import text_cache
+from resources import asset_cache
+from stats import percentile
+
+FRAME_BUDGET_MS = 1000 / 60
+
+class Section:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, self.start, time.perf_counter_ns())
+        return False
+
+class NullSection:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+NULL_SECTION = NullSection()
+
+class Profiler:
+    def __init__(self, window=300):
+        self.enabled = False
+        self.window = window
+        self.sections = {}
+        self.stages = {}
+        self.frame_times = deque(maxlen=window)
+        self.events = deque(maxlen=window * 16)
+        self.frame_start = 0
+        self.origin = time.perf_counter_ns()
+        self.panel = None
+        self.font = None
+
+    def section(self, name):
+        # Disabled profiling costs one attribute check per stage
+        if not self.enabled:
+            return NULL_SECTION
+        section = self.sections.get(name)
+        if section is None:
+            section = self.sections[name] = Section(self, name)
+        return section
+
+    def record(self, name, start, end):
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = deque(maxlen=self.window)
+        stage.append((end - start) / 1e6)
+        self.events.append((name, start, end))
+
+    def begin_frame(self):
+        if self.enabled:
+            self.frame_start = time.perf_counter_ns()
+
+    def end_frame(self):
+        if self.enabled and self.frame_start:
+            end = time.perf_counter_ns()
+            self.frame_times.append((end - self.frame_start) / 1e6)
+            self.events.append(("frame", self.frame_start, end))
+
+    def reset(self):
+        self.stages.clear()
+        self.frame_times.clear()
+        self.events.clear()
+        self.frame_start = 0
+
+    def summary(self):
+        stages = {"frame": self.frame_times}
+        stages.update(self.stages)
+        result = {}
+        for name, samples in stages.items():
+            ordered = sorted(samples)
+            result[name] = {
+                "p50_ms": percentile(ordered, 0.50),
+                "p95_ms": percentile(ordered, 0.95),
+                "p99_ms": percentile(ordered, 0.99),
+            }
+        return result
+
+    def dump_trace(self, path):
+        # Chrome trace event format, open with chrome://tracing or Perfetto
+        events = [
+            {
+                "name": name,
+                "ph": "X",
+                "ts": (start - self.origin) / 1000,
+                "dur": (end - start) / 1000,
+                "pid": 0,
+                "tid": 0,
+            }
+            for name, start, end in self.events
+        ]
+        with open(path, 'w') as f:
+            json.dump({"traceEvents": events, "summary": self.summary()}, f)
+        return path
+
+    def draw(self, screen, extra_lines=()):
+        if self.font is None:
+            self.font = text_cache.get_font(None, 20)
+        font = self.font
+        lines = []
+        for name, stats in self.summary().items():
+            lines.append(f"{name}: {stats['p50_ms']:.2f} / {stats['p95_ms']:.2f} / {stats['p99_ms']:.2f}")
+        lines.extend(extra_lines)
+
+        graph_height = 60
+        line_height = font.get_linesize()
+        width = 300
+        height = graph_height + 10 + line_height * (len(lines) + 1)
+        if self.panel is None or self.panel.get_size() != (width, height):
+            self.panel = pygame.Surface((width, height), pygame.SRCALPHA)
+            asset_cache.record_allocation(overlay=True)
+        self.panel.fill((0, 0, 0, 170))
+        # The readouts change every frame, so they are rendered uncached
+        asset_cache.record_allocation(len(lines) + 1, overlay=True)
+
+        self.panel.blit(font.render("ms p50 / p95 / p99", True, GOLD), (5, 0))
+        for i, line in enumerate(lines):
+            self.panel.blit(font.render(line, True, WHITE), (5, line_height * (i + 1)))
+
+        # Frame-time graph, the red line marks the 60 FPS budget
+        bottom = height - 5
+        scale = graph_height / (FRAME_BUDGET_MS * 2)
+        budget_y = bottom - int(FRAME_BUDGET_MS * scale)
+        samples = list(self.frame_times)[-(width - 10):]
+        for x, frame_time in enumerate(samples):
+            color = RED if frame_time > FRAME_BUDGET_MS else GREEN
+            top = bottom - min(graph_height, int(frame_time * scale))
+            pygame.draw.line(self.panel, color, (5 + x, bottom), (5 + x, top))
+        pygame.draw.line(self.panel, RED, (5, budget_y), (width - 5, budget_y))
+
+        screen.blit(self.panel, (screen.get_width() - width - 10, 10))
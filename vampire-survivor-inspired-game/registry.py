@@ -0,0 +1,38 @@
+import pygame
+
+CHUNKED_KINDS = ("enemies", "items", "coins")
+KINDS = CHUNKED_KINDS + ("projectiles", "melee_attacks")
+
+class EntityRegistry:
+    def __init__(self, chunk_map):
+        # Every entity sits in exactly one group, so kill() only has one group to leave.
+        # World entities live in their chunk's group, short-lived attacks in a group per kind
+        self.chunk_map = chunk_map
+        self.projectiles = pygame.sprite.Group()
+        self.melee_attacks = pygame.sprite.Group()
+
+    def add(self, sprite, kind):
+        # False means the position is outside the live chunks and the sprite was not stored
+        if kind in CHUNKED_KINDS:
+            return self.chunk_map.add(sprite, kind)
+        getattr(self, kind).add(sprite)
+        return True
+
+    def sprites(self, kind):
+        if kind in CHUNKED_KINDS:
+            return [sprite for chunk in self.chunk_map.chunks.values() for sprite in getattr(chunk, kind)]
+        return getattr(self, kind).sprites()
+
+    def count(self, kind):
+        if kind in CHUNKED_KINDS:
+            return sum(len(getattr(chunk, kind)) for chunk in self.chunk_map.chunks.values())
+        return len(getattr(self, kind))
+
+    def total(self):
+        return sum(self.count(kind) for kind in KINDS)
+
+    def clear(self):
+        for kind in KINDS:
+            for sprite in self.sprites(kind):
+                sprite.kill()  # Hands pooled entities back
+        self.chunk_map.clear()
@@ -0,0 +1,79 @@
+import pygame
+from constants import WIDTH, HEIGHT
+
+class TiledBackground:
+    def __init__(self, tile_size=50, colors=((100, 100, 100), (80, 80, 80))):
+        # The checkerboard repeats every two tiles, so a surface one period larger than the
+        # viewport covers every possible camera offset with a single opaque blit
+        self.period = tile_size * 2
+        self.surface = pygame.Surface((WIDTH + self.period, HEIGHT + self.period))
+        for y in range(0, self.surface.get_height(), tile_size):
+            for x in range(0, self.surface.get_width(), tile_size):
+                color = colors[(x // tile_size + y // tile_size) % 2]
+                pygame.draw.rect(self.surface, color, (x, y, tile_size, tile_size))
+        self.surface = self.surface.convert() if pygame.display.get_surface() else self.surface
+        self.area = pygame.Rect(0, 0, WIDTH, HEIGHT)
+
+    def draw(self, screen, camera_x, camera_y):
+        # Same offset the old per-chunk blits produced (start = camera % -CHUNK_SIZE)
+        self.area.topleft = (-camera_x % self.period, -camera_y % self.period)
+        screen.blit(self.surface, (0, 0), self.area)
+
+# Draw order of the sprite layers, the background is blitted before all of them
+LAYER_PICKUPS = 0
+LAYER_ENEMIES = 1
+LAYER_ATTACKS = 2
+LAYER_PLAYER = 3
+LAYER_COUNT = 4
+
+class FrameDiff:
+    def __init__(self, band_height=16):
+        # Copy of the last frame pushed under a key, compared band by band with each redraw
+        self.band_height = band_height
+        self.previous = None
+        self.key = None
+
+    def reset(self):
+        self.previous = None
+        self.key = None
+
+    def changed(self, screen, key):
+        # Full-width rects where screen differs from that copy, the whole screen when the key
+        # changed or nothing is known about what the display shows
+        rect = screen.get_rect()
+        if self.previous is None or self.key != key or self.previous.get_size() != rect.size:
+            self.previous = screen.copy()
+            self.key = key
+            return [rect]
+        pitch = screen.get_pitch()
+        current, previous = screen.get_buffer().raw, self.previous.get_buffer().raw
+        dirty = []
+        for top in range(0, rect.height, self.band_height):
+            start, end = top * pitch, min(top + self.band_height, rect.height) * pitch
+            if current[start:end] == previous[start:end]:
+                continue
+            band = pygame.Rect(0, top, rect.width, min(self.band_height, rect.height - top))
+            if dirty and dirty[-1].bottom == band.top:
+                dirty[-1].union_ip(band)
+            else:
+                dirty.append(band)
+        if dirty:
+            self.previous.blit(screen, (0, 0))
+        return dirty
+
+class RenderQueue:
+    def __init__(self, layer_count=LAYER_COUNT):
+        # (surface, position) pairs per layer, submitted with one Surface.blits call each
+        self.layers = [[] for _ in range(layer_count)]
+
+    def clear(self):
+        for batch in self.layers:
+            batch.clear()
+
+    def extend(self, layer, pairs):
+        self.layers[layer].extend(pairs)
+
+    def submit(self, screen):
+        for batch in self.layers:
+            if batch:
+                screen.blits(batch, doreturn=False)
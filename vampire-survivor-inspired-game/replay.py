@@ -0,0 +1,136 @@
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # Set before headless pulls in pygame
+
+# Header is followed by JSON metadata and the zlib-compressed moves, one byte per tick
+MAGIC = b"VSRP"
+VERSION = 6  # Bumped whenever a simulation change makes older replays diverge
+HEADER = struct.Struct("<4sBQII")  # magic, version, seed, ticks, metadata length
+MOVES = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+
+def encode_move(dx, dy):
+    return (dx + 1) * 3 + (dy + 1)
+
+def state_hash(game):
+    # Covers everything a desync would disturb: the player, every enemy and every pickup
+    digest = hashlib.sha256()
+    player = game.player
+    digest.update(repr((
+        game.ticks, game.score, game.coins_collected, game.game_over,
+        player.rect.center, player.health, player.level, player.experience,
+    )).encode())
+    if game.swarm is not None:
+        count = len(game.swarm)
+        for array in (game.swarm.x, game.swarm.y, game.swarm.health):
+            digest.update(array[:count].tobytes())
+    else:
+        digest.update(repr(sorted((enemy.rect.center, enemy.health) for enemy in game.entities.sprites("enemies"))).encode())
+    digest.update(repr(sorted(item.rect.center for item in game.entities.sprites("items"))).encode())
+    digest.update(repr(sorted(coin.rect.center for coin in game.entities.sprites("coins"))).encode())
+    return digest.hexdigest()
+
+class Replay:
+    def __init__(self, seed, character_type, enemy_backend="sprites", upgrades=None, moves=b"", final_hash=None):
+        self.seed = seed
+        self.character_type = character_type
+        self.enemy_backend = enemy_backend
+        self.upgrades = dict(upgrades or {})
+        self.moves = bytes(moves)
+        self.final_hash = final_hash
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        metadata = json.dumps({
+            "character": self.character_type,
+            "backend": self.enemy_backend,
+            "upgrades": self.upgrades,
+            "hash": self.final_hash,
+        }).encode()
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.seed, len(self.moves), len(metadata)))
+            f.write(metadata)
+            f.write(zlib.compress(self.moves, 9))
+        return path
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, seed, ticks, metadata_length = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} replay")
+        start = HEADER.size + metadata_length
+        metadata = json.loads(data[HEADER.size:start])
+        moves = zlib.decompress(data[start:])
+        if len(moves) != ticks:
+            raise ValueError(f"{path} is truncated, expected {ticks} ticks and found {len(moves)}")
+        return Replay(seed, metadata["character"], metadata["backend"], metadata["upgrades"], moves, metadata["hash"])
+
+class ReplayRecorder:
+    def __init__(self, input_source):
+        # Wraps another input source and logs what it returned on every tick
+        self.input_source = input_source
+        self.replay = None
+        self.moves = bytearray()
+
+    def start(self, seed, character_type, enemy_backend, upgrades):
+        self.replay = Replay(seed, character_type, enemy_backend, upgrades)
+        self.moves.clear()
+
+    def read(self, game):
+        dx, dy = self.input_source.read(game)
+        self.moves.append(encode_move(dx, dy))
+        return dx, dy
+
+    def save(self, path, game):
+        self.replay.moves = bytes(self.moves)
+        self.replay.final_hash = state_hash(game)
+        return self.replay.save(path)
+
+class ReplayInput:
+    def __init__(self, moves):
+        self.moves = moves
+        self.index = 0
+
+    def read(self, game):
+        if self.index >= len(self.moves):
+            return 0, 0
+        move = MOVES[self.moves[self.index]]
+        self.index += 1
+        return move
+
+def play(replay):
+    # Re-simulates the run headless as fast as possible and checks it lands on the recorded state
+    from headless import HeadlessEngine
+
+    engine = HeadlessEngine(replay.character_type, ReplayInput(replay.moves), enemy_backend=replay.enemy_backend,
+                            seed=replay.seed, upgrades=replay.upgrades)
+    start = time.perf_counter()
+    summary = engine.run(len(replay.moves))
+    elapsed = time.perf_counter() - start
+    summary["ticks_per_second"] = engine.ticks / elapsed if elapsed else 0.0
+    summary["state_hash"] = state_hash(engine.game)
+    summary["verified"] = replay.final_hash is None or summary["state_hash"] == replay.final_hash
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a recorded run back headless and verify its final state")
+    parser.add_argument("replay", help="Replay file written with replay recording enabled")
+    args = parser.parse_args()
+
+    summary = play(Replay.load(args.replay))
+    print(json.dumps(summary, indent=2))
+    if not summary["verified"]:
+        print("Replay diverged from the recorded run", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import pygame
+
+class AssetCache:
+    def __init__(self):
+        self.surfaces = {}
+        self.hits = 0
+        self.misses = 0
+        self.allocated = 0
+        self.frame_mark = 0
+        self.frame_allocations = 0
+        # The profiler overlay's own surfaces, kept apart so they never mask gameplay churn
+        self.overlay_allocated = 0
+        self.overlay_mark = 0
+        self.frame_overlay_allocations = 0
+
+    def get(self, path, size, flip=False, fallback=None, alpha=None):
+        # A translucent variant is its own entry, the opaque one it is copied from stays untouched
+        key = (path, size, flip, alpha)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        if alpha is not None:
+            surface = self.get(path, size, flip, fallback).copy()
+            surface.set_alpha(alpha)
+        elif flip:
+            surface = pygame.transform.flip(self.get(path, size, False, fallback), True, False)
+        else:
+            try:
+                surface = pygame.image.load(path).convert_alpha()
+                surface = pygame.transform.scale(surface, size)
+            except (pygame.error, FileNotFoundError):
+                if fallback is None:
+                    raise
+                surface = fallback(size)
+        self.allocated += 1
+        self.surfaces[key] = surface
+        return surface
+
+    def record_allocation(self, count=1, overlay=False):
+        # Surfaces made outside the cache, like text renders, count toward the frame total too
+        if overlay:
+            self.overlay_allocated += count
+        else:
+            self.allocated += count
+
+    def end_frame(self):
+        # Gameplay surfaces created since the previous call, sprite cache misses included
+        self.frame_allocations = self.allocated - self.frame_mark
+        self.frame_mark = self.allocated
+        self.frame_overlay_allocations = self.overlay_allocated - self.overlay_mark
+        self.overlay_mark = self.overlay_allocated
+        return self.frame_allocations
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "cached": len(self.surfaces),
+            "allocated": self.allocated,
+            "frame_allocations": self.frame_allocations,
+            "frame_overlay_allocations": self.frame_overlay_allocations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+# Shared by every entity so each sprite is decoded and scaled once per process
+asset_cache = AssetCache()
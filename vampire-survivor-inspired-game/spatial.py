@@ -0,0 +1,112 @@
+import math
+import pygame
+
+def collision_radius(sprite):
+    # Same fallback pygame.sprite.collide_circle uses for sprites without a radius
+    radius = getattr(sprite, 'radius', None)
+    if radius is None:
+        radius = 0.5 * ((sprite.rect.width ** 2 + sprite.rect.height ** 2) ** 0.5)
+    return radius
+
+class SpatialHash:
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.keys = {}
+        # Largest distance from a stored sprite's center to the edge of its hitbox
+        self.reach = 0
+
+    def cell_of(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def clear(self):
+        self.cells.clear()
+        self.keys.clear()
+        self.reach = 0
+
+    def rebuild(self, sprites):
+        self.clear()
+        for sprite in sprites:
+            self.insert(sprite)
+
+    def insert(self, sprite):
+        key = self.cell_of(*sprite.rect.center)
+        cell = self.cells.get(key)
+        if cell is None:
+            self.cells[key] = [sprite]
+        else:
+            cell.append(sprite)
+        self.keys[sprite] = key
+        half_diagonal = 0.5 * ((sprite.rect.width ** 2 + sprite.rect.height ** 2) ** 0.5)
+        self.reach = max(self.reach, half_diagonal, collision_radius(sprite))
+
+    def remove(self, sprite):
+        key = self.keys.pop(sprite, None)
+        if key is None:
+            return
+        cell = self.cells[key]
+        cell.remove(sprite)
+        if not cell:
+            del self.cells[key]
+
+    def query_area(self, left, top, right, bottom):
+        # Every stored sprite whose center lies in a cell touching the area
+        min_x, min_y = self.cell_of(left - self.reach, top - self.reach)
+        max_x, max_y = self.cell_of(right + self.reach, bottom + self.reach)
+        found = []
+        for cell_y in range(min_y, max_y + 1):
+            for cell_x in range(min_x, max_x + 1):
+                cell = self.cells.get((cell_x, cell_y))
+                if cell:
+                    found.extend(cell)
+        return found
+
+    def query_rect(self, rect):
+        return self.query_area(rect.left, rect.top, rect.right, rect.bottom)
+
+    def query_circle(self, x, y, radius):
+        return self.query_area(x - radius, y - radius, x + radius, y + radius)
+
+    def ring(self, center_x, center_y, radius):
+        if radius == 0:
+            yield center_x, center_y
+            return
+        for cell_x in range(center_x - radius, center_x + radius + 1):
+            yield cell_x, center_y - radius
+            yield cell_x, center_y + radius
+        for cell_y in range(center_y - radius + 1, center_y + radius):
+            yield center_x - radius, cell_y
+            yield center_x + radius, cell_y
+
+    def k_nearest(self, x, y, k, max_distance):
+        # Walk outward ring by ring and stop once no unvisited cell can hold anything closer
+        center_x, center_y = self.cell_of(x, y)
+        max_ring = int(max_distance // self.cell_size) + 1
+        found = []
+        for radius in range(max_ring + 1):
+            if len(found) >= k and found[k - 1][1] <= (radius - 1) * self.cell_size:
+                break
+            for key in self.ring(center_x, center_y, radius):
+                cell = self.cells.get(key)
+                if not cell:
+                    continue
+                for sprite in cell:
+                    if not sprite.alive():
+                        continue
+                    distance = math.hypot(sprite.rect.centerx - x, sprite.rect.centery - y)
+                    if distance <= max_distance:
+                        found.append((sprite, distance))
+            found.sort(key=lambda entry: entry[1])
+        return found[:k]
+
+    def nearest(self, x, y, max_distance):
+        found = self.k_nearest(x, y, 1, max_distance)
+        return found[0] if found else None
+
+    def collide_circle(self, sprite):
+        # Killed sprites are skipped until the next rebuild
+        x, y = sprite.rect.center
+        return [
+            other for other in self.query_circle(x, y, collision_radius(sprite))
+            if other.alive() and pygame.sprite.collide_circle(sprite, other)
+        ]
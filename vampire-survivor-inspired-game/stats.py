@@ -0,0 +1,8 @@
+import math
+
+def percentile(ordered, fraction):
+    # Nearest-rank percentile of an already sorted sequence, shared so every report agrees
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1)
+    return ordered[max(index, 0)]
@@ -0,0 +1,164 @@
+import pygame
+from entities import Enemy
+
+try:
+    import numpy as np
+except ImportError:  # The swarm backend is optional, the sprite backend needs nothing extra
+    np = None
+
+class SwarmTarget:
+    __slots__ = ("rect",)
+
+    def __init__(self, rect):
+        self.rect = rect
+
+class SwarmSprite(pygame.sprite.Sprite):
+    def __init__(self):
+        super().__init__()
+        self.image = Enemy.get_sprite()
+        self.rect = self.image.get_rect()
+        self.radius = int(min(self.rect.width, self.rect.height) * 0.25)
+
+class EnemySwarm:
+    def __init__(self, capacity=1024):
+        if np is None:
+            raise RuntimeError("The swarm enemy backend requires numpy")
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        # Positions before the latest tick, rendering blends from these toward x and y
+        self.previous_x = np.zeros(capacity)
+        self.previous_y = np.zeros(capacity)
+        self.speed = np.zeros(capacity)
+        self.health = np.zeros(capacity)
+        self.radius = np.zeros(capacity)
+        self.facing_left = np.zeros(capacity, dtype=bool)
+        self.alive = np.zeros(capacity, dtype=bool)
+        # Render sprites are reused from frame to frame and only exist for on-screen enemies
+        self.sprites = []
+        self.visible = []
+        self.right_image = Enemy.get_sprite()
+        self.left_image = Enemy.get_sprite(flip=True)
+        self.sprite_size = self.right_image.get_size()
+        self.default_radius = int(min(self.sprite_size) * 0.25)
+
+    def __len__(self):
+        return self.count
+
+    def grow(self, needed):
+        capacity = len(self.x)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ("x", "y", "previous_x", "previous_y", "speed", "health", "radius", "facing_left", "alive"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def spawn(self, positions, speeds, health=30):
+        added = len(positions)
+        self.grow(self.count + added)
+        start, end = self.count, self.count + added
+        points = np.asarray(positions, dtype=float).reshape(added, 2)
+        self.x[start:end] = points[:, 0]
+        self.y[start:end] = points[:, 1]
+        self.previous_x[start:end] = points[:, 0]  # Spawned mid-frame, drawn where they are
+        self.previous_y[start:end] = points[:, 1]
+        self.speed[start:end] = speeds
+        self.health[start:end] = health
+        self.radius[start:end] = self.default_radius
+        self.facing_left[start:end] = False
+        self.alive[start:end] = True
+        self.count = end
+
+    def snapshot(self):
+        n = self.count
+        self.previous_x[:n] = self.x[:n]
+        self.previous_y[:n] = self.y[:n]
+
+    def step(self, target_x, target_y):
+        n = self.count
+        dx = target_x - self.x[:n]
+        dy = target_y - self.y[:n]
+        dist = np.hypot(dx, dy)
+        moving = dist != 0
+        scale = np.divide(self.speed[:n], dist, out=np.zeros(n), where=moving)
+        self.x[:n] += dx * scale
+        self.y[:n] += dy * scale
+        # Facing only changes when there is horizontal movement, same as FacingSprite
+        self.facing_left[:n] = np.where(dx < 0, True, np.where(dx > 0, False, self.facing_left[:n]))
+
+    def in_circle(self, x, y, radius):
+        n = self.count
+        reach = radius + self.radius[:n]
+        hit = (self.x[:n] - x) ** 2 + (self.y[:n] - y) ** 2 <= reach * reach
+        return np.flatnonzero(hit & self.alive[:n])
+
+    def damage(self, indices, amount):
+        self.health[indices] -= amount
+        killed = indices[self.health[indices] <= 0]
+        self.alive[killed] = False
+        return len(killed)
+
+    def remove(self, indices):
+        self.alive[indices] = False
+
+    def remove_outside(self, left, top, right, bottom):
+        n = self.count
+        inside = (self.x[:n] >= left) & (self.x[:n] < right) & (self.y[:n] >= top) & (self.y[:n] < bottom)
+        self.alive[:n] &= inside
+
+    def cull(self):
+        # Compact the live enemies to the front of every array
+        keep = np.flatnonzero(self.alive[:self.count])
+        kept = len(keep)
+        if kept == self.count:
+            return
+        for name in ("x", "y", "previous_x", "previous_y", "speed", "health", "radius", "facing_left", "alive"):
+            array = getattr(self, name)
+            array[:kept] = array[keep]
+        self.count = kept
+
+    def k_nearest(self, x, y, k, max_distance):
+        n = self.count
+        dist = np.hypot(self.x[:n] - x, self.y[:n] - y)
+        candidates = np.flatnonzero((dist <= max_distance) & self.alive[:n])
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(dist[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(dist[candidates], kind="stable")]
+        return [(self.target(index), float(dist[index])) for index in candidates]
+
+    def nearest(self, x, y, max_distance):
+        found = self.k_nearest(x, y, 1, max_distance)
+        return found[0] if found else None
+
+    def target(self, index):
+        rect = pygame.Rect((0, 0), self.sprite_size)
+        rect.center = (int(self.x[index]), int(self.y[index]))
+        return SwarmTarget(rect)
+
+    def materialize(self, view_rect, alpha=1.0):
+        # Hand out render sprites for the enemies overlapping the view only, placed alpha of
+        # the way from their previous position to their current one
+        n = self.count
+        if alpha >= 1:
+            x, y = self.x[:n], self.y[:n]
+        else:
+            x = self.previous_x[:n] + (self.x[:n] - self.previous_x[:n]) * alpha
+            y = self.previous_y[:n] + (self.y[:n] - self.previous_y[:n]) * alpha
+        half_w, half_h = self.sprite_size[0] / 2, self.sprite_size[1] / 2
+        on_screen = (
+            self.alive[:n]
+            & (x + half_w >= view_rect.left) & (x - half_w <= view_rect.right)
+            & (y + half_h >= view_rect.top) & (y - half_h <= view_rect.bottom)
+        )
+        indices = np.flatnonzero(on_screen)
+        while len(self.sprites) < len(indices):
+            self.sprites.append(SwarmSprite())
+        for sprite, index in zip(self.sprites, indices):
+            sprite.rect.center = (int(x[index]), int(y[index]))
+            sprite.image = self.left_image if self.facing_left[index] else self.right_image
+        self.visible = self.sprites[:len(indices)]
+        return self.visible
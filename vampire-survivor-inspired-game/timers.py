@@ -0,0 +1,34 @@
+class TimerWheel:
+    def __init__(self, slot_count=256):
+        # Hashed wheel of tick slots, an event further out than one turn waits in its slot
+        # until the wheel comes round on its due tick, so advance() only looks at one slot
+        self.slots = [[] for _ in range(slot_count)]
+        self.tick = 0
+        self.pending = 0
+
+    def schedule(self, delay, callback, *args):
+        # Fires callback(*args) at the end of the tick delay ticks from now, at least one
+        due = self.tick + max(1, int(delay))
+        self.slots[due % len(self.slots)].append((due, callback, args))
+        self.pending += 1
+        return due
+
+    def advance(self):
+        self.tick += 1
+        index = self.tick % len(self.slots)
+        slot = self.slots[index]
+        if not slot:
+            return 0
+        due_now = [event for event in slot if event[0] <= self.tick]
+        if not due_now:
+            return 0
+        self.slots[index] = [event for event in slot if event[0] > self.tick]
+        self.pending -= len(due_now)
+        for _, callback, args in due_now:
+            callback(*args)
+        return len(due_now)
+
+    def clear(self):
+        for slot in self.slots:
+            slot.clear()
+        self.pending = 0
@@ -1,5 +1,51 @@
 import pygame
+from collections import OrderedDict
 from constants import WIDTH, HEIGHT, WHITE, BLACK, GREEN, GOLD, RED, WARRIOR, MAGE, ARCHER
+from pricing import CostTable
+from resources import asset_cache
+
+BULK_PURCHASE = 10  # Levels bought by a shift-click
+
+class TextCache:
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.fonts = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_font(self, name, size):
+        font = self.fonts.get((name, size))
+        if font is None:
+            font = self.fonts[(name, size)] = pygame.font.Font(name, size)
+        return font
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        asset_cache.record_allocation()
+        surface = self.surfaces[key] = font.render(text, True, color)
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "cached": len(self.surfaces),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+# Shared so unchanged labels and HUD values are rasterized once, not every frame
+text_cache = TextCache()
 
 class Button:
     def __init__(self, x, y, width, height, text, color, text_color):
@@ -10,8 +56,7 @@ class Button:
 
     def draw(self, screen):
         pygame.draw.rect(screen, self.color, self.rect)
-        font = pygame.font.Font(None, 36)
-        text = font.render(self.text, True, self.text_color)
+        text = text_cache.render(text_cache.get_font(None, 36), self.text, self.text_color)
         text_rect = text.get_rect(center=self.rect.center)
         screen.blit(text, text_rect)
 
@@ -83,65 +128,74 @@ class Shop:
             {"name": "Attack Speed Up", "base_cost": 25, "effect": lambda player, level: setattr(player, "attack_speed", player.attack_speed + 0.1 * level)},
             {"name": "Cooldown Reduction", "base_cost": 30, "effect": lambda player, level: setattr(player, "cooldown_reduction", player.cooldown_reduction + 0.05 * level)},
         ]
-        self.buttons = []
+        # Catalog keyed by name, each upgrade carries a prefix-sum cost table
+        self.catalog = {item['name']: item for item in self.items}
+        for item in self.items:
+            item['costs'] = CostTable(item['base_cost'])
+        self.buttons = [
+            Button(WIDTH // 2 - 200, HEIGHT // 2 - 150 + i * 60, 400, 40, "", GREEN, BLACK)
+            for i in range(len(self.items))
+        ]
         self.update_buttons()
         self.back_button = Button(WIDTH // 2 - 100, HEIGHT - 100, 200, 40, "Back to Menu", GREEN, BLACK)
         self.reset_button = Button(WIDTH // 2 - 100, HEIGHT - 160, 200, 40, "Reset Upgrades", RED, WHITE)
 
     def update_buttons(self):
-        self.buttons = [
-            Button(WIDTH // 2 - 200, HEIGHT // 2 - 150 + i * 60, 400, 40, f"{item['name']} (Cost: {self.calculate_cost(i)})", GREEN, BLACK)
-            for i, item in enumerate(self.items)
-        ]
+        for i in range(len(self.items)):
+            self.update_button(i)
+
+    def update_button(self, index):
+        item = self.items[index]
+        self.buttons[index].text = f"{item['name']} (Cost: {self.calculate_cost(index)})"
 
-    def calculate_cost(self, index):
-        base_cost = self.items[index]['base_cost']
-        level = self.upgrades.get(self.items[index]['name'], 0)
-        return int(base_cost * (1.5 ** level))
+    def calculate_cost(self, index, count=1):
+        item = self.items[index]
+        return item['costs'].cost(self.upgrades.get(item['name'], 0), count)
 
     def reset_upgrades(self):
-        refund = sum(self.calculate_refund(item['name']) for item in self.items)
-        for item in self.items:
-            self.upgrades[item['name']] = 0
+        refund = sum(self.calculate_refund(name) for name in self.catalog)
+        for name in self.catalog:
+            self.upgrades[name] = 0
         self.update_buttons()
         return refund
 
     def calculate_refund(self, upgrade_name):
-        level = self.upgrades.get(upgrade_name, 0)
-        base_cost = next(item['base_cost'] for item in self.items if item['name'] == upgrade_name)
-        return sum(int(base_cost * (1.5 ** i)) for i in range(level))
+        return self.catalog[upgrade_name]['costs'].refund(self.upgrades.get(upgrade_name, 0))
 
     def draw(self, screen, total_coins):
         screen.fill(BLACK)
-        title_text = self.font.render("Shop", True, WHITE)
-        coins_text = self.font.render(f"Total Coins: {total_coins}", True, GOLD)
+        title_text = text_cache.render(self.font, "Shop", WHITE)
+        coins_text = text_cache.render(self.font, f"Total Coins: {total_coins}", GOLD)
         screen.blit(title_text, (WIDTH // 2 - 50, 70))
         screen.blit(coins_text, (WIDTH // 2 - 100, 120))
 
         for i, button in enumerate(self.buttons):
             button.draw(screen)
-            level_text = self.font.render(f"Level: {self.upgrades.get(self.items[i]['name'], 0)}", True, WHITE)
+            level_text = text_cache.render(self.font, f"Level: {self.upgrades.get(self.items[i]['name'], 0)}", WHITE)
             screen.blit(level_text, (button.rect.right + 10, button.rect.centery - 10))
 
         self.back_button.draw(screen)
         self.reset_button.draw(screen)
 
-    def handle_purchase(self, total_coins, button_index):
+    def handle_purchase(self, total_coins, button_index, count=1):
+        # Buys up to count levels, as many as the coins cover
         if button_index < len(self.items):
             item = self.items[button_index]
-            cost = self.calculate_cost(button_index)
-            if total_coins >= cost:
-                self.upgrades[item['name']] = self.upgrades.get(item['name'], 0) + 1
-                total_coins -= cost
-                self.update_buttons()
-                return total_coins, self.upgrades
+            level = self.upgrades.get(item['name'], 0)
+            count = item['costs'].affordable(level, total_coins, count)
+            if count > 0:
+                self.upgrades[item['name']] = level + count
+                total_coins -= item['costs'].cost(level, count)
+                self.update_button(button_index)
         return total_coins, self.upgrades
 
     def handle_event(self, event, total_coins):
         if event.type == pygame.MOUSEBUTTONDOWN:
             for i, button in enumerate(self.buttons):
                 if button.is_clicked(event.pos):
-                    return self.handle_purchase(total_coins, i)
+                    # Shift-click buys levels in bulk
+                    count = BULK_PURCHASE if pygame.key.get_mods() & pygame.KMOD_SHIFT else 1
+                    return self.handle_purchase(total_coins, i, count)
             if self.back_button.is_clicked(event.pos):
                 return "menu", self.upgrades
             if self.reset_button.is_clicked(event.pos):
@@ -156,12 +210,12 @@ class Statistics:
 
     def draw(self, screen, stats):
         screen.fill(BLACK)
-        title_text = self.font.render("Statistics", True, WHITE)
+        title_text = text_cache.render(self.font, "Statistics", WHITE)
         screen.blit(title_text, (WIDTH // 2 - 70, 70))
 
         y = 150
         for key, value in stats.items():
-            text = self.font.render(f"{key}: {value}", True, WHITE)
+            text = text_cache.render(self.font, f"{key}: {value}", WHITE)
             screen.blit(text, (WIDTH // 2 - 100, y))
             y += 50
 
@@ -177,23 +231,39 @@ class Settings:
     def __init__(self, font):
         self.font = font
         self.title = self.font.render("Settings", True, WHITE)
-        self.hitbox_button = Button(WIDTH // 2 - 100, HEIGHT // 2 - 25, 200, 50, "Toggle Hitboxes", GREEN, BLACK)
+        self.hitbox_button = Button(WIDTH // 2 - 100, HEIGHT // 2 - 120, 200, 50, "Toggle Hitboxes", GREEN, BLACK)
+        self.profiler_button = Button(WIDTH // 2 - 100, HEIGHT // 2 - 15, 200, 50, "Toggle Profiler", GREEN, BLACK)
+        self.replay_button = Button(WIDTH // 2 - 100, HEIGHT // 2 + 90, 200, 50, "Record Replays", GREEN, BLACK)
         self.back_button = Button(WIDTH // 2 - 100, HEIGHT - 100, 200, 40, "Back to Menu", GREEN, BLACK)
 
-    def draw(self, screen, show_hitboxes):
+    def draw(self, screen, show_hitboxes, show_profiler=False, record_replays=False):
         screen.fill(BLACK)
-        screen.blit(self.title, (WIDTH // 2 - self.title.get_width() // 2, HEIGHT // 4))
+        screen.blit(self.title, (WIDTH // 2 - self.title.get_width() // 2, HEIGHT // 4 - 40))
         self.hitbox_button.draw(screen)
+        self.profiler_button.draw(screen)
+        self.replay_button.draw(screen)
         self.back_button.draw(screen)
 
         hitbox_status = "ON" if show_hitboxes else "OFF"
-        status_text = self.font.render(f"Hitboxes: {hitbox_status}", True, WHITE)
+        status_text = text_cache.render(self.font, f"Hitboxes: {hitbox_status}", WHITE)
+        screen.blit(status_text, (WIDTH // 2 - status_text.get_width() // 2, HEIGHT // 2 - 55))
+
+        profiler_status = "ON (F9 dumps a trace)" if show_profiler else "OFF"
+        status_text = text_cache.render(self.font, f"Profiler: {profiler_status}", WHITE)
         screen.blit(status_text, (WIDTH // 2 - status_text.get_width() // 2, HEIGHT // 2 + 50))
 
+        replay_status = "ON (saved on game over)" if record_replays else "OFF"
+        status_text = text_cache.render(self.font, f"Replays: {replay_status}", WHITE)
+        screen.blit(status_text, (WIDTH // 2 - status_text.get_width() // 2, HEIGHT // 2 + 155))
+
     def handle_event(self, event, show_hitboxes):
         if event.type == pygame.MOUSEBUTTONDOWN:
             if self.hitbox_button.is_clicked(event.pos):
                 return "toggle_hitboxes"
+            elif self.profiler_button.is_clicked(event.pos):
+                return "toggle_profiler"
+            elif self.replay_button.is_clicked(event.pos):
+                return "toggle_replays"
             elif self.back_button.is_clicked(event.pos):
                 return "menu"
         return None